@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from fast_api_async.container import Container
+from fast_api_async.models import User, table_registry
+from fast_api_async.security import (
+    create_access_token,
+    get_password_hash,
+    token_claims,
+)
+from fast_api_async.settings import Settings
+
+
+def pytest_sessionstart(session):
+    """
+    Encerra com código 1 quando `--benchmark-compare` não acha baseline.
+
+    Sem uma execução salva, o pytest-benchmark apenas avisa que não pode
+    comparar e a sessão passa, de modo que nenhuma regressão falharia o
+    CI; como no `load.py --ci`, a falta do baseline é um erro.
+    """
+    benchmarks = session.config._benchmarksession
+    if benchmarks.compare and not benchmarks.compared_mapping:
+        pytest.exit(
+            f'no benchmark baseline in {benchmarks.storage}; '
+            'run `task bench_baseline` first',
+            returncode=1,
+        )
+
+
+@pytest.fixture
+def run():
+    """
+    Fixture que executa corrotinas em um event loop dedicado.
+
+    O pytest-benchmark mede funções síncronas; as corrotinas medidas são
+    executadas com `run(coro)`.
+
+    Yields:
+        Callable: `loop.run_until_complete` do loop do teste
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def settings():
+    return Settings(
+        _env_file=None,
+        DATABASE_URL='sqlite+aiosqlite:///:memory:',
+        HASHING_MAX_WORKERS=0,
+        SECRET_KEY='bench-secret-key-for-hs256-signatures',
+    )
+
+
+@pytest.fixture
+def container(run, settings):
+    """
+    Fixture com os recursos da aplicação sobre um banco em memória.
+    """
+    container = Container.from_settings(settings)
+
+    async def create_all():
+        async with container.engine.begin() as conn:
+            await conn.run_sync(table_registry.metadata.create_all)
+
+    run(create_all())
+    yield container
+    run(container.aclose())
+
+
+@pytest.fixture
+def users(run, container):
+    """
+    Fixture que cadastra 100 usuários e os retorna em ordem de id.
+    """
+    password = get_password_hash('secret')
+
+    async def seed():
+        async with container.session_factory() as session:
+            users = [
+                User(
+                    username=f'user{i}',
+                    email=f'user{i}@example.com',
+                    password=password,
+                )
+                for i in range(100)
+            ]
+            session.add_all(users)
+            await session.commit()
+            return users
+
+    return run(seed())
+
+
+@pytest.fixture
+def token(container, users):
+    return create_access_token(
+        data=token_claims(users[0]), keys=container.token_keys
+    )
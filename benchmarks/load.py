@@ -0,0 +1,377 @@
+"""
+Teste de carga dos endpoints contra uma instância local do uvicorn.
+
+Sobe a aplicação em um subprocesso com um banco SQLite temporário, dispara
+requisições concorrentes com httpx para cada rota e reporta latência
+p50/p95/p99 e requisições por segundo. Os resultados são comparados com
+um baseline salvo; uma regressão acima da tolerância encerra com código 1.
+O baseline de referência fica versionado em `benchmarks/baseline.json`;
+no modo CI (`--ci` ou a variável `CI`), a falta dele também é um erro.
+
+Uso:
+    python -m benchmarks.load                    # compara com o baseline
+    python -m benchmarks.load --update-baseline  # grava um novo baseline
+    python -m benchmarks.load --ci               # falha sem baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from itertools import count
+from pathlib import Path
+
+import httpx
+
+from fast_api_async.database import create_engine_from_settings
+from fast_api_async.models import table_registry
+from fast_api_async.settings import Settings
+
+DEFAULT_BASELINE = Path(__file__).parent / 'baseline.json'
+PASSWORD = 'load-test-secret'
+
+
+@dataclass
+class Scenario:
+    """
+    Rota medida no teste de carga.
+
+    Attributes:
+        name (str): Identificador da rota no relatório
+        requests (int): Quantidade de requisições disparadas
+        build (Callable): Corrotina que recebe o índice da requisição e
+            retorna os argumentos de `httpx.AsyncClient.request`
+    """
+
+    name: str
+    requests: int
+    build: Callable[[int], Awaitable[dict]]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _create_schema(database_url: str):
+    settings = Settings(_env_file=None, DATABASE_URL=database_url)
+    engine = create_engine_from_settings(settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+    await engine.dispose()
+
+
+async def _wait_until_ready(client: httpx.AsyncClient, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get('/')
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError('uvicorn did not start in time')
+
+
+async def _signup(client: httpx.AsyncClient, name: str) -> tuple[int, str]:
+    response = await client.post(
+        '/users/',
+        json={
+            'username': name,
+            'email': f'{name}@example.com',
+            'password': PASSWORD,
+        },
+    )
+    response.raise_for_status()
+    token = await client.post(
+        '/token',
+        data={'username': f'{name}@example.com', 'password': PASSWORD},
+    )
+    token.raise_for_status()
+    return response.json()['id'], token.json()['access_token']
+
+
+def _scenarios(owner, victims, seq, scale: int) -> list[Scenario]:
+    owner_id, owner_token = owner
+    auth = {'Authorization': f'Bearer {owner_token}'}
+
+    def new_user(prefix):
+        name = f'{prefix}{next(seq)}'
+        return {
+            'username': name,
+            'email': f'{name}@example.com',
+            'password': PASSWORD,
+        }
+
+    async def root(i):
+        return {'method': 'GET', 'url': '/'}
+
+    async def token(i):
+        return {
+            'method': 'POST',
+            'url': '/token',
+            'data': {'username': 'owner@example.com', 'password': PASSWORD},
+        }
+
+    async def create(i):
+        return {'method': 'POST', 'url': '/users/', 'json': new_user('c')}
+
+    async def bulk(i):
+        return {
+            'method': 'POST',
+            'url': '/users/bulk',
+            'headers': auth,
+            'json': {'users': [new_user('b') for _ in range(10)]},
+        }
+
+    async def list_users(i):
+        return {
+            'method': 'GET',
+            'url': '/users/',
+            'headers': auth,
+            'params': {'limit': 50},
+        }
+
+    async def export(i):
+        return {'method': 'GET', 'url': '/users/export', 'headers': auth}
+
+    async def put(i):
+        return {
+            'method': 'PUT',
+            'url': f'/users/{owner_id}',
+            'headers': auth,
+            'json': {
+                'username': 'owner',
+                'email': 'owner@example.com',
+                'password': PASSWORD,
+            },
+        }
+
+    async def patch(i):
+        return {
+            'method': 'PATCH',
+            'url': f'/users/{owner_id}',
+            'headers': auth,
+            'json': {'username': 'owner'},
+        }
+
+    async def delete(i):
+        victim_id, victim_token = victims[i]
+        return {
+            'method': 'DELETE',
+            'url': f'/users/{victim_id}',
+            'headers': {'Authorization': f'Bearer {victim_token}'},
+        }
+
+    return [
+        Scenario('GET /', 200 * scale, root),
+        Scenario('POST /token', 20 * scale, token),
+        Scenario('POST /users/', 20 * scale, create),
+        Scenario('POST /users/bulk', 5 * scale, bulk),
+        Scenario('GET /users/', 200 * scale, list_users),
+        Scenario('GET /users/export', 20 * scale, export),
+        Scenario('PUT /users/{id}', 20 * scale, put),
+        Scenario('PATCH /users/{id}', 100 * scale, patch),
+        Scenario('DELETE /users/{id}', len(victims), delete),
+    ]
+
+
+async def _measure(
+    client: httpx.AsyncClient, scenario: Scenario, concurrency: int
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        request = await scenario.build(i)
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append(time.perf_counter() - start)
+        if response.is_error:
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(scenario.requests)))
+    elapsed = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': scenario.requests,
+        'errors': errors,
+        'rps': scenario.requests / elapsed,
+        'p50_ms': cuts[49] * 1000,
+        'p95_ms': cuts[94] * 1000,
+        'p99_ms': cuts[98] * 1000,
+    }
+
+
+async def run_load(concurrency: int, scale: int) -> dict:
+    """
+    Sobe a aplicação, executa todos os cenários e retorna as métricas.
+
+    Args:
+        concurrency (int): Requisições simultâneas por cenário
+        scale (int): Multiplicador da quantidade de requisições
+
+    Returns:
+        dict: Métricas por rota (rps, p50_ms, p95_ms, p99_ms, errors)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f'sqlite+aiosqlite:///{Path(tmp) / "load.db"}'
+        await _create_schema(database_url)
+
+        port = _free_port()
+        # O cenário de login repete a mesma conta e o mesmo IP; sem isso o
+        # rate limiting mediria respostas 429 em vez do Argon2.
+        env = {
+            **os.environ,
+            'DATABASE_URL': database_url,
+            'SECRET_KEY': secrets.token_urlsafe(32),
+            'LOGIN_RATE_LIMIT_PER_IP': '0',
+            'LOGIN_RATE_LIMIT_PER_ACCOUNT': '0',
+        }
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                '-m',
+                'uvicorn',
+                'fast_api_async.app:app',
+                '--port',
+                str(port),
+                '--no-access-log',
+                '--log-level',
+                'warning',
+            ],
+            env=env,
+        )
+        try:
+            async with httpx.AsyncClient(
+                base_url=f'http://127.0.0.1:{port}', timeout=60
+            ) as client:
+                await _wait_until_ready(client)
+
+                seq = count()
+                owner = await _signup(client, 'owner')
+                victims = [
+                    await _signup(client, f'victim{i}')
+                    for i in range(5 * scale)
+                ]
+
+                results = {}
+                for scenario in _scenarios(owner, victims, seq, scale):
+                    results[scenario.name] = await _measure(
+                        client, scenario, concurrency
+                    )
+                return results
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compara os resultados com o baseline e lista as regressões.
+
+    Uma rota regride quando o p95 cresce ou o RPS cai mais que a
+    tolerância, ou quando passa a retornar erros.
+
+    Args:
+        results (dict): Métricas da execução atual
+        baseline (dict): Métricas de referência
+        tolerance (float): Variação aceita (0.2 = 20%)
+
+    Returns:
+        list[str]: Descrição de cada regressão encontrada
+    """
+    regressions = []
+    for route, reference in baseline.items():
+        current = results.get(route)
+        if current is None:
+            continue
+        if current['errors'] > reference['errors']:
+            regressions.append(f'{route}: {current["errors"]} errors')
+        if current['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{route}: p95 {current["p95_ms"]:.1f}ms '
+                f'(baseline {reference["p95_ms"]:.1f}ms)'
+            )
+        if current['rps'] < reference['rps'] * (1 - tolerance):
+            regressions.append(
+                f'{route}: {current["rps"]:.0f} rps '
+                f'(baseline {reference["rps"]:.0f} rps)'
+            )
+    return regressions
+
+
+def _print_report(results: dict):
+    header = (
+        f'{"route":<22}{"requests":>9}{"errors":>8}{"rps":>9}'
+        f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+    )
+    print(header)
+    print('-' * len(header))
+    for route, r in results.items():
+        print(
+            f'{route:<22}{r["requests"]:>9}{r["errors"]:>8}{r["rps"]:>9.0f}'
+            f'{r["p50_ms"]:>9.1f}{r["p95_ms"]:>9.1f}{r["p99_ms"]:>9.1f}'
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', type=Path)
+    parser.add_argument(
+        '--ci',
+        action='store_true',
+        default=os.environ.get('CI', '').lower() in {'1', 'true', 'yes'},
+        help='Falha quando não há baseline (padrão com a variável CI)',
+    )
+    args = parser.parse_args(argv)
+
+    missing_baseline = not args.baseline.exists()
+    if missing_baseline and args.ci and not args.update_baseline:
+        print(f'no baseline at {args.baseline}; required in CI mode')
+        return 1
+
+    results = asyncio.run(run_load(args.concurrency, args.scale))
+    _print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f'\nbaseline saved to {args.baseline}')
+        return 0
+
+    if missing_baseline:
+        print(f'\nno baseline at {args.baseline}; run with --update-baseline')
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import orjson
+import pytest
+
+from fast_api_async.compression import CompressionPolicy
+from fast_api_async.schemas import UserList
+from fast_api_async.security import (
+    create_access_token,
+    get_current_user,
+    get_password_hash,
+    verify_password,
+)
+from fast_api_async.tokens import TokenKeys
+
+
+def test_get_password_hash(benchmark):
+    benchmark(get_password_hash, 'secret')
+
+
+def test_verify_password(benchmark):
+    hashed = get_password_hash('secret')
+    benchmark(verify_password, 'secret', hashed)
+
+
+def test_create_access_token(benchmark, settings):
+    keys = TokenKeys.from_settings(settings)
+    benchmark(create_access_token, {'sub': 'user@example.com'}, keys)
+
+
+def test_get_current_user_from_db(benchmark, run, container, users, token):
+    container.principal_cache.maxsize = 0
+
+    async def resolve():
+        async with container.session_factory() as session:
+            return await get_current_user(session, token, container)
+
+    user = benchmark(lambda: run(resolve()))
+    assert user.id == users[0].id
+
+
+def test_get_current_user_from_cache(benchmark, run, container, users, token):
+    async def resolve():
+        async with container.session_factory() as session:
+            return await get_current_user(session, token, container)
+
+    run(resolve())
+    user = benchmark(lambda: run(resolve()))
+    assert user.id == users[0].id
+
+
+def test_serialize_user_list(benchmark, users):
+    body = benchmark(
+        lambda: UserList.model_validate({'users': users}).model_dump_json()
+    )
+    assert body.startswith('{"users":')
+
+
+def test_serialize_user_rows_orjson(benchmark, users):
+    rows = [(user.username, user.email, user.id) for user in users]
+    body = benchmark(
+        lambda: orjson.dumps({
+            'users': [
+                {'username': username, 'email': email, 'id': user_id}
+                for username, email, user_id in rows
+            ]
+        })
+    )
+    assert body.startswith(b'{"users":')
+
+
+@pytest.mark.parametrize(
+    ('encoding', 'level'),
+    [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 11)],
+)
+def test_compress_user_list(benchmark, users, encoding, level):
+    body = orjson.dumps({
+        'users': [
+            {'username': user.username, 'email': user.email, 'id': user.id}
+            for user in users
+        ]
+    })
+    policy = CompressionPolicy(gzip_level=level, brotli_quality=level)
+
+    compressed = benchmark(
+        lambda: policy.compressor(encoding).compress(body, final=True)
+    )
+    # Tempo (CPU) x tamanho por nível: a razão fica no relatório JSON
+    benchmark.extra_info['ratio'] = round(len(compressed) / len(body), 3)
+    assert len(compressed) < len(body)
@@ -1,48 +1,215 @@
+import csv
+import io
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
+from typing import Annotated, Literal
 
-from fastapi import Depends, FastAPI, HTTPException
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+)
+from sqlalchemy import (
+    Row,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-
-from fast_api_async.database import get_session
-from fast_api_async.models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_api_async.compression import CompressionMiddleware
+from fast_api_async.container import Container, get_container
+from fast_api_async.database import ReadSessionFactory, get_session
+from fast_api_async.metrics import ContainerCollector, MetricsMiddleware
+from fast_api_async.models import RefreshToken, User
+from fast_api_async.pagination import decode_cursor, encode_cursor
 from fast_api_async.schemas import (
     Message,
+    RefreshTokenSchema,
     Token,
+    UserBulkResult,
+    UserBulkSchema,
+    UserFilter,
     UserList,
     UserPublic,
     UserSchema,
+    UserUpdate,
 )
 from fast_api_async.security import (
+    CurrentUser,
+    Principal,
     create_access_token,
+    get_current_principal,
     get_current_user,
-    get_password_hash,
-    verify_password,
+    get_read_session_factory,
+    invalidate_cached_user,
+    limit_login_attempts,
+    pin_reads_to_primary,
+    token_claims,
 )
+from fast_api_async.settings import Settings
+from fast_api_async.tokens import hash_refresh_token, new_refresh_token
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+USER_PUBLIC_COLUMNS = (User.username, User.email, User.id)
+USER_TOKEN_COLUMNS = (User.id, User.username, User.email, User.token_version)
+USER_SORT_KEYS = {
+    'id': (User.id,),
+    'username': (User.username,),
+    'created_at': (User.created_at, User.id),
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da aplicação.
 
-app = FastAPI(title='Minha API')
+    Cria o container de recursos (engine, fábrica de sessões, serviço de
+    hashing e caches) na inicialização e o encerra no shutdown, de modo
+    que importar a aplicação não lê configurações nem abre conexões.
+
+    Um container já presente em `app.state.container` (por exemplo,
+    criado pelos testes) é reaproveitado e fica sob responsabilidade de
+    quem o criou. Em ambos os casos o container é preparado com
+    `Container.start` (threadpool do anyio e hash descartável dos logins).
+    """
+    if getattr(app.state, 'container', None) is not None:
+        await app.state.container.start()
+        yield
+        return
+
+    container = Container.from_settings(Settings())
+    await container.start()
+    app.state.container = container
+    try:
+        yield
+    finally:
+        del app.state.container
+        await container.aclose()
+
+
+app = FastAPI(
+    title='Minha API',
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get('/', status_code=HTTPStatus.OK, response_model=Message)
-def read_root():
+async def read_root():
     return {'message': 'Olá mundo!'}
 
 
-# TODO: Refatorar create_user para contemplar cenário de email e username
-# duplicados
-@app.post('/users/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
-def create_user(user: UserSchema, session=Depends(get_session)):
+@app.get('/metrics', include_in_schema=False)
+async def metrics(container: Container = Depends(get_container)):
+    """
+    Expõe as métricas da aplicação no formato do Prometheus.
+
+    Inclui as métricas por requisição registradas pelo middleware e o
+    estado atual do pool de conexões, da fila de hashing e do
+    threadpool.
+
+    Args:
+        container (Container): Recursos da aplicação injetados via
+            dependency
+
+    Returns:
+        Response: Métricas em texto no formato de exposição do Prometheus
+    """
+    registry = CollectorRegistry()
+    registry.register(ContainerCollector(container))
+    return Response(
+        generate_latest(REGISTRY) + generate_latest(registry),
+        media_type=CONTENT_TYPE_LATEST,
+    )
+
+
+# Constraints e índices únicos de `users`, pelo nome no PostgreSQL e pela
+# lista de colunas (ou nome do índice de expressão) no SQLite
+UNIQUE_VIOLATION_DETAILS = {
+    'users_username_key': 'Username already exists',
+    'users.username': 'Username already exists',
+    'users_email_key': 'Email already exists',
+    'users.email': 'Email already exists',
+    'ix_users_email_lower': 'Email already exists',
+    "index 'ix_users_email_lower'": 'Email already exists',
+}
+
+
+def _violated_constraint(exc: IntegrityError) -> str | None:
+    orig = exc.orig
+    # asyncpg (encapsulado pelo SQLAlchemy em `__cause__`) e psycopg
+    # expõem o nome da constraint violada
+    for error in (orig, getattr(orig, '__cause__', None)):
+        name = getattr(error, 'constraint_name', None) or getattr(
+            getattr(error, 'diag', None), 'constraint_name', None
+        )
+        if name:
+            return name
+    # SQLite: 'UNIQUE constraint failed: users.username'
+    _, _, target = str(orig).partition('UNIQUE constraint failed: ')
+    return target.strip() or None
+
+
+def unique_violation_detail(exc: IntegrityError) -> str:
+    """
+    Traduz a violação de unicidade em `users` na mensagem de erro da API.
+
+    A coluna é identificada pelo nome da constraint ou do índice violado,
+    nunca pelo texto livre do erro, que inclui os valores enviados.
+
+    Args:
+        exc (IntegrityError): Erro levantado pelo INSERT ou UPDATE
+
+    Returns:
+        str: Mensagem para o campo `detail` da resposta
+    """
+    return UNIQUE_VIOLATION_DETAILS.get(
+        _violated_constraint(exc), 'Email or username already exists'
+    )
+
+
+@app.post(
+    '/users/',
+    status_code=HTTPStatus.CREATED,
+    response_model=UserPublic,
+    dependencies=[Depends(pin_reads_to_primary)],
+)
+async def create_user(
+    user: UserSchema,
+    session: AsyncSession = Depends(get_session),
+    container: Container = Depends(get_container),
+):
     """
     Cria um novo usuário no sistema.
 
-    Verifica se o username e email são únicos antes de criar o usuário.
-    A senha é automaticamente hasheada antes de ser armazenada.
+    A unicidade de username e email é garantida pelas constraints do
+    banco: o usuário é inserido com um único `INSERT ... RETURNING id`
+    e uma violação de unicidade é convertida no erro correspondente.
+    Isso evita a consulta prévia e a janela de corrida entre cadastros
+    concorrentes. A senha é automaticamente hasheada antes de ser
+    armazenada.
 
     Args:
         user (UserSchema): Dados do usuário (username, email, password)
-        session (Session): Sessão do banco de dados injetada via dependency
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
 
     Raises:
         HTTPException: 400 BAD_REQUEST se username já existe
@@ -51,63 +218,426 @@ def create_user(user: UserSchema, session=Depends(get_session)):
     Returns:
         UserPublic: Dados públicos do usuário criado (sem a senha)
     """
-    db_user = session.scalar(
-        select(User).where(
-            (User.username == user.username) | (User.email == user.email)
+    hashed_password = await container.hasher.hash(user.password)
+
+    try:
+        user_id = await session.scalar(
+            insert(User)
+            .values(
+                username=user.username,
+                email=user.email,
+                password=hashed_password,
+            )
+            .returning(User.id)
+        )
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=unique_violation_detail(exc),
+        )
+    container.user_count.adjust(1)
+    await container.response_cache.invalidate('users')
+
+    return {'id': user_id, 'username': user.username, 'email': user.email}
+
+
+@app.post(
+    '/users/bulk',
+    status_code=HTTPStatus.CREATED,
+    response_model=UserBulkResult,
+    dependencies=[Depends(pin_reads_to_primary)],
+)
+async def create_users_bulk(
+    payload: UserBulkSchema,
+    session: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+    container: Container = Depends(get_container),
+):
+    """
+    Cria vários usuários em uma única requisição.
+
+    Endpoint protegido pensado para importações. Os conflitos de username
+    e email (com a base ou dentro do próprio lote) são detectados com uma
+    única consulta; as senhas dos usuários válidos são hasheadas em
+    paralelo, abaixo de `HASHING_BULK_MAX_CONCURRENCY` para não atrasar
+    os logins, e todos são inseridos com um único INSERT em lote
+    (executemany com RETURNING) na mesma transação.
+
+    Args:
+        payload (UserBulkSchema): Lista de usuários a serem criados
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
+        current_user (CurrentUser): Usuário autenticado injetado via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
+
+    Raises:
+        HTTPException: 409 CONFLICT se um usuário concorrente ocupou
+            username ou email durante a importação
+
+    Returns:
+        UserBulkResult: Usuários criados e conflitos por índice do lote
+    """
+    usernames = {user.username for user in payload.users}
+    emails = {user.email.lower() for user in payload.users}
+    existing = await session.execute(
+        select(User.username, func.lower(User.email)).where(
+            User.username.in_(usernames) | func.lower(User.email).in_(emails)
         )
     )
 
-    if db_user:
-        if db_user.username == user.username:
-            raise HTTPException(
-                status_code=HTTPStatus.BAD_REQUEST,
-                detail='Username already exists',
-            )
-        if db_user.email == user.email:
-            raise HTTPException(
-                status_code=HTTPStatus.BAD_REQUEST,
-                detail='Email already exists',
+    taken_usernames = set()
+    taken_emails = set()
+    for username, email in existing:
+        taken_usernames.add(username)
+        taken_emails.add(email)
+
+    accepted = []
+    conflicts = []
+    for index, user in enumerate(payload.users):
+        if user.username in taken_usernames:
+            conflicts.append({
+                'index': index,
+                'detail': 'Username already exists',
+            })
+        elif user.email.lower() in taken_emails:
+            conflicts.append({
+                'index': index,
+                'detail': 'Email already exists',
+            })
+        else:
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email.lower())
+            accepted.append(user)
+
+    if not accepted:
+        return {'created': [], 'conflicts': conflicts}
+
+    hashes = await container.hasher.hash_many(
+        user.password for user in accepted
+    )
+
+    try:
+        created = await session.execute(
+            insert(User).returning(
+                User.id,
+                User.username,
+                User.email,
+                sort_by_parameter_order=True,
+            ),
+            [
+                {
+                    'username': user.username,
+                    'email': user.email,
+                    'password': hashed,
+                }
+                for user, hashed in zip(accepted, hashes)
+            ],
+        )
+        created = created.mappings().all()
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Email or username already exists',
+        )
+
+    container.user_count.adjust(len(created))
+    await container.response_cache.invalidate('users')
+
+    return {'created': created, 'conflicts': conflicts}
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def user_filters(filters: UserFilter) -> list:
+    """
+    Converte os filtros da listagem de usuários em condições SQL.
+
+    Args:
+        filters (UserFilter): Filtros recebidos em GET /users/
+
+    Returns:
+        list: Condições para `Select.where`
+    """
+    clauses = []
+    if filters.username is not None:
+        prefix = filters.username
+        # O LIKE ignora maiúsculas no SQLite e as diferencia no PostgreSQL;
+        # a comparação exata do início do username torna o filtro sensível
+        # a maiúsculas nos dois, e o LIKE continua servindo ao índice
+        # `ix_users_username_pattern`.
+        clauses.extend((
+            User.username.startswith(prefix, autoescape=True),
+            func.substr(User.username, 1, len(prefix)) == prefix,
+        ))
+    if filters.email_domain is not None:
+        clauses.append(
+            func.lower(User.email).endswith(
+                f'@{filters.email_domain.lower()}', autoescape=True
             )
+        )
+    if filters.created_after is not None:
+        clauses.append(User.created_at >= _naive_utc(filters.created_after))
+    if filters.created_before is not None:
+        clauses.append(User.created_at < _naive_utc(filters.created_before))
+    return clauses
 
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        password=get_password_hash(user.password),
+
+def _cursor_position(cursor: str, sort: str, columns: tuple) -> list:
+    invalid_cursor = HTTPException(
+        status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
     )
+    try:
+        key, *position = decode_cursor(cursor)
+    except ValueError:
+        raise invalid_cursor
+    if key != sort or len(position) != len(columns):
+        raise invalid_cursor
+
+    values = []
+    for column, raw in zip(columns, position):
+        value = raw
+        python_type = column.type.python_type
+        if python_type is datetime and isinstance(raw, str):
+            try:
+                value = datetime.fromisoformat(raw)
+            except ValueError:
+                raise invalid_cursor
+        if not isinstance(value, python_type):
+            raise invalid_cursor
+        values.append(value)
+    return values
+
+
+async def _users_total(session: AsyncSession, container: Container) -> int:
+    total = container.user_count.get()
+    if total is None:
+        total = await session.scalar(select(func.count()).select_from(User))
+        container.user_count.set(total)
+    return total
+
+
+@app.get('/users/', status_code=HTTPStatus.OK, response_model=UserList)
+async def read_users(
+    request: Request,
+    filters: Annotated[UserFilter, Query()],
+    session_factory: ReadSessionFactory = Depends(get_read_session_factory),
+    principal: Principal = Depends(get_current_principal),
+    container: Container = Depends(get_container),
+):
+    """
+    Lista os usuários cadastrados no sistema com filtros e paginação.
+
+    Endpoint protegido que requer autenticação via Bearer token; a
+    identidade vem das claims do token, sem consulta ao banco. Retorna
+    uma lista paginada de usuários, ordenada por id por padrão.
+
+    Suporta dois modos de paginação: por offset (padrão) e por cursor
+    (keyset). No modo cursor, a consulta parte da chave de ordenação da
+    última linha da página anterior (`WHERE (created_at, id) > (?, ?)`),
+    mantendo o custo proporcional ao tamanho da página
+    independentemente da profundidade. Quando a página está cheia,
+    `next_cursor` traz o cursor da próxima página. Cada ordenação é
+    atendida por um índice (`id`, `username` ou `(created_at, id)`).
+
+    A consulta seleciona apenas as colunas públicas (nunca o hash da
+    senha) e a resposta é montada diretamente das tuplas e serializada
+    com orjson, sem instanciar entidades nem validar cada usuário com
+    Pydantic; `UserList` documenta o formato da resposta.
+
+    O corpo serializado fica em cache por rota e parâmetros, na versão
+    atual da tabela de usuários (avançada a cada cadastro, alteração ou
+    exclusão). A resposta traz um ETag fraco; um `If-None-Match`
+    correspondente recebe `304 Not Modified`, sem consulta nem corpo; a
+    sessão só é aberta quando a resposta não está em cache. Logo após
+    uma escrita do próprio cliente (cookie de pin), a leitura ignora o
+    cache e vai ao primário, e a resposta obtida substitui a da chave:
+    uma leitura concorrente em uma réplica atrasada pode ter guardado
+    dados anteriores à escrita na versão nova.
 
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    Args:
+        request (Request): Requisição, usada na chave do cache e no
+            `If-None-Match`
+        filters (UserFilter): Parâmetros de filtro, ordenação e paginação
+            - limit: Número máximo de usuários por página, limitado a
+              `MAX_PAGE_SIZE`. Defaults to 10.
+            - offset: Número de registros a pular (ignorado quando
+              `cursor` é informado). Defaults to 0.
+            - cursor: Cursor opaco retornado em `next_cursor`, válido
+              apenas para a mesma ordenação
+            - username: Prefixo do username (diferencia maiúsculas)
+            - email_domain: Domínio do email (sem diferenciar
+              maiúsculas)
+            - created_after / created_before: Intervalo de cadastro
+              (início inclusivo, fim exclusivo)
+            - sort: `id`, `username` ou `created_at`, com `-` para ordem
+              decrescente. Defaults to 'id'.
+            - include_total: Inclui `total`, o número de usuários
+              cadastrados, em listagens sem filtros. O valor vem de uma
+              contagem em cache (`USER_COUNT_TTL_SECONDS`), ajustada
+              pelos cadastros e exclusões, e não de um `COUNT(*)` por
+              requisição. Defaults to False.
+        session_factory (ReadSessionFactory): Abre a sessão somente
+            leitura (réplica, quando configurada) nas falhas do cache
+        principal (Principal): Identidade autenticada injetada via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
 
-    return db_user
+    Raises:
+        HTTPException: 400 BAD_REQUEST se o cursor é inválido
 
+    Returns:
+        Response: Lista de usuários (`UserList`) com filtros e paginação
+            aplicados, ou `304 Not Modified`
+    """
+    cache = container.response_cache
+    key = await cache.key('users', request)
+    cached = None
+    if not container.replica_router.pinned(request):
+        cached = await cache.get(key)
+    if cached is None:
+        async with session_factory() as session:
+            page = await _users_page(filters, session, container)
+        cached = await cache.store(key, ORJSONResponse(page).body)
+    return cache.respond(cached, request)
+
+
+async def _users_page(
+    filters: UserFilter, session: AsyncSession, container: Container
+) -> dict:
+    limit = min(filters.limit, container.settings.MAX_PAGE_SIZE)
+    descending = filters.sort.startswith('-')
+    sort = filters.sort.removeprefix('-')
+    columns = USER_SORT_KEYS[sort]
+
+    clauses = user_filters(filters)
+    selected = {c.key: c for c in (*USER_PUBLIC_COLUMNS, *columns)}
+    query = (
+        select(*selected.values())
+        .where(*clauses)
+        .order_by(
+            *(column.desc() if descending else column for column in columns)
+        )
+        .limit(limit)
+    )
 
-@app.get('/users/', status_code=HTTPStatus.OK, response_model=UserList)
-def read_users(
-    limit: int = 10,
-    offset: int = 0,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    if filters.cursor is not None:
+        position = _cursor_position(filters.cursor, sort, columns)
+        if len(columns) == 1:
+            key, after = columns[0], position[0]
+        else:
+            key = tuple_(*columns)
+            after = tuple_(*position, types=[c.type for c in columns])
+        query = query.where(key < after if descending else key > after)
+    else:
+        query = query.offset(filters.offset)
+
+    rows = (await session.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) == limit:
+        position = [getattr(rows[-1], column.key) for column in columns]
+        next_cursor = encode_cursor([
+            sort,
+            *(
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in position
+            ),
+        ])
+
+    total = None
+    if filters.include_total and not clauses:
+        total = await _users_total(session, container)
+
+    users = [
+        {'username': row.username, 'email': row.email, 'id': row.id}
+        for row in rows
+    ]
+    return {'users': users, 'next_cursor': next_cursor, 'total': total}
+
+
+async def _stream_users(
+    session_factory: ReadSessionFactory, export_format: str
+):
+    async with session_factory() as session:
+        result = await session.stream(
+            select(User.id, User.username, User.email)
+            .order_by(User.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(UserPublic.model_fields)
+            async for rows in result.partitions():
+                writer.writerows(
+                    (row.username, row.email, row.id) for row in rows
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            async for rows in result.partitions():
+                yield b''.join(
+                    orjson.dumps(
+                        {
+                            'username': row.username,
+                            'email': row.email,
+                            'id': row.id,
+                        },
+                        option=orjson.OPT_APPEND_NEWLINE,
+                    )
+                    for row in rows
+                )
+
+
+@app.get('/users/export', status_code=HTTPStatus.OK)
+async def export_users(
+    export_format: Annotated[
+        Literal['ndjson', 'csv'], Query(alias='format')
+    ] = 'ndjson',
+    session_factory: ReadSessionFactory = Depends(get_read_session_factory),
+    principal: Principal = Depends(get_current_principal),
 ):
     """
-    Lista todos os usuários cadastrados no sistema com paginação.
+    Exporta todos os usuários em streaming, como NDJSON ou CSV.
 
-    Endpoint protegido que requer autenticação via Bearer token.
-    Retorna uma lista paginada de usuários.
+    Endpoint protegido que percorre a tabela com um cursor do lado do
+    servidor (`yield_per`), enviando cada lote assim que é lido. O uso
+    de memória é constante, independentemente do tamanho da tabela.
 
     Args:
-        limit (int, optional): Número máximo de usuários por página.
-            Defaults to 10.
-        offset (int, optional): Número de registros a pular (para paginação).
-            Defaults to 0.
-        session (Session): Sessão do banco de dados injetada via dependency
-        current_user (User): Usuário autenticado injetado via dependency
+        export_format (str, optional): Formato da exportação, `ndjson` ou
+            `csv` (query param `format`). Defaults to 'ndjson'.
+        session_factory (ReadSessionFactory): Fábrica de sessões usada
+            para abrir uma sessão que dura todo o streaming
+        principal (Principal): Identidade autenticada injetada via
+            dependency
 
     Returns:
-        UserList: Lista de usuários com paginação aplicada
+        StreamingResponse: Usuários no formato público (sem a senha)
     """
-    users = session.scalars(select(User).limit(limit).offset(offset))
-    return {'users': users}
+    return StreamingResponse(
+        _stream_users(session_factory, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="users.{export_format}"'
+            )
+        },
+    )
 
 
 # @app.get(
@@ -121,26 +651,61 @@ def read_users(
 #     return database[user_id - 1]
 
 
+async def _update_user_row(
+    session: AsyncSession, user_id: int, values: dict
+) -> dict:
+    try:
+        result = await session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(User.id, User.username, User.email)
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.mappings().one()
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Email or username already exists',
+        )
+    return updated
+
+
 @app.put(
-    '/users/{user_id}', status_code=HTTPStatus.OK, response_model=UserPublic
+    '/users/{user_id}',
+    status_code=HTTPStatus.OK,
+    response_model=UserPublic,
+    dependencies=[Depends(pin_reads_to_primary)],
 )
-def update_user(
+async def update_user(
     user_id: int,
     user: UserSchema,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+    container: Container = Depends(get_container),
 ):
     """
     Atualiza os dados de um usuário específico.
 
     Endpoint protegido que permite apenas que o próprio usuário
     atualize seus dados. Verifica permissões e unicidade de dados.
+    Os dados são gravados com um único `UPDATE ... RETURNING`. Se a senha
+    enviada difere da atual (o hash é lido pela chave primária apenas
+    aqui), ela é regravada e a versão de token do usuário é
+    incrementada, de modo que os tokens já emitidos deixam de valer;
+    reenviar a mesma senha mantém os tokens.
 
     Args:
         user_id (int): ID do usuário a ser atualizado
         user (UserSchema): Novos dados do usuário (username, email, password)
-        session (Session): Sessão do banco de dados injetada via dependency
-        current_user (User): Usuário autenticado injetado via dependency
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
+        current_user (CurrentUser): Usuário autenticado injetado via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
 
     Raises:
         HTTPException: 403 FORBIDDEN se usuário tentar atualizar outro usuário
@@ -153,30 +718,98 @@ def update_user(
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
-    try:
-        current_user.email = user.email
-        current_user.username = user.username
-        current_user.password = get_password_hash(user.password)
 
-        session.add(current_user)
-        session.commit()
-        session.refresh(current_user)
+    values = {'username': user.username, 'email': user.email}
+    stored_hash = await session.scalar(
+        select(User.password).where(User.id == user_id)
+    )
+    if not await container.hasher.verify(user.password, stored_hash):
+        values['password'] = await container.hasher.hash(user.password)
+        values['token_version'] = User.token_version + 1
 
-        return current_user
-    except IntegrityError:
+    updated = await _update_user_row(session, user_id, values)
+    invalidate_cached_user(container, user_id)
+    await container.response_cache.invalidate('users')
+
+    return updated
+
+
+@app.patch(
+    '/users/{user_id}',
+    status_code=HTTPStatus.OK,
+    response_model=UserPublic,
+    dependencies=[Depends(pin_reads_to_primary)],
+)
+async def patch_user(
+    user_id: int,
+    user: UserUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+    container: Container = Depends(get_container),
+):
+    """
+    Atualiza parcialmente os dados de um usuário específico.
+
+    Endpoint protegido que permite apenas que o próprio usuário
+    atualize seus dados. Somente os campos enviados são alterados; a
+    senha só é hasheada quando informada, de modo que edições de perfil
+    custam apenas um `UPDATE ... RETURNING`. Trocar a senha incrementa a
+    versão de token do usuário, revogando os tokens já emitidos.
+
+    Args:
+        user_id (int): ID do usuário a ser atualizado
+        user (UserUpdate): Campos a serem alterados (username, email e/ou
+            password)
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
+        current_user (CurrentUser): Usuário autenticado injetado via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
+
+    Raises:
+        HTTPException: 403 FORBIDDEN se usuário tentar atualizar outro usuário
+        HTTPException: 409 CONFLICT se email ou username já existem
+
+    Returns:
+        UserPublic: Dados públicos do usuário atualizado
+    """
+    if current_user.id != user_id:
         raise HTTPException(
-            status_code=HTTPStatus.CONFLICT,
-            detail='Email or username already exists',
+            status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
+        )
+
+    values = user.model_dump(exclude_unset=True, exclude_none=True)
+    if not values:
+        current = await session.execute(
+            select(User.id, User.username, User.email).where(
+                User.id == user_id
+            )
         )
+        return current.mappings().one()
+
+    if 'password' in values:
+        values['password'] = await container.hasher.hash(values['password'])
+        values['token_version'] = User.token_version + 1
+
+    updated = await _update_user_row(session, user_id, values)
+    invalidate_cached_user(container, user_id)
+    await container.response_cache.invalidate('users')
+
+    return updated
 
 
 @app.delete(
-    '/users/{user_id}', status_code=HTTPStatus.OK, response_model=Message
+    '/users/{user_id}',
+    status_code=HTTPStatus.OK,
+    response_model=Message,
+    dependencies=[Depends(pin_reads_to_primary)],
 )
-def delete_user(
+async def delete_user(
     user_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    current_user: CurrentUser = Depends(get_current_user),
+    container: Container = Depends(get_container),
 ):
     """
     Remove um usuário específico do sistema.
@@ -186,8 +819,12 @@ def delete_user(
 
     Args:
         user_id (int): ID do usuário a ser removido
-        session (Session): Sessão do banco de dados injetada via dependency
-        current_user (User): Usuário autenticado injetado via dependency
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
+        current_user (CurrentUser): Usuário autenticado injetado via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
 
     Raises:
         HTTPException: 403 FORBIDDEN se usuário tentar deletar outro usuário
@@ -199,8 +836,11 @@ def delete_user(
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
-    session.delete(current_user)
-    session.commit()
+    await session.execute(delete(User).where(User.id == user_id))
+    await session.commit()
+    container.user_count.adjust(-1)
+    await container.response_cache.invalidate('users')
+    invalidate_cached_user(container, user_id)
     return {'message': 'User deleted'}
 
 
@@ -213,44 +853,171 @@ def delete_user(
 # e fazer seus testes para 200 e 404.
 
 
-@app.post('/token', response_model=Token, status_code=HTTPStatus.OK)
-def login_for_access_token(
+@app.post(
+    '/token',
+    response_model=Token,
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(limit_login_attempts)],
+)
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
+    container: Container = Depends(get_container),
 ):
     """
     Endpoint de autenticação para obter token de acesso.
 
     Valida as credenciais do usuário (email/senha) e retorna um
-    JWT token para autenticação em endpoints protegidos.
+    JWT token para autenticação em endpoints protegidos, junto com um
+    refresh token para renovação via `POST /token/refresh` sem repetir
+    a verificação da senha.
+
+    O email é comparado sem diferenciar maiúsculas, usando o índice
+    único em `lower(email)`, e apenas as colunas usadas na emissão do
+    token e o hash da senha são lidos, sem carregar a entidade.
+
+    Todo login custa exatamente um Argon2: emails inexistentes são
+    verificados contra um hash descartável, para que a resposta não
+    revele pelo tempo se a conta existe. Hashes com parâmetros antigos
+    são regravados na mesma transação que emite o refresh token, na
+    qual também são removidos os refresh tokens expirados.
 
     Args:
         form_data (OAuth2PasswordRequestForm): Dados de login
             (username=email, password)
-        session (Session): Sessão do banco de dados injetada via dependency
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
 
     Raises:
         HTTPException: 401 UNAUTHORIZED se credenciais são inválidas
         HTTPException: 401 UNAUTHORIZED se usuário não existe
+        HTTPException: 429 TOO_MANY_REQUESTS se o IP ou a conta excederam
+            o limite de tentativas
 
     Returns:
-        Token: Access token JWT e tipo do token (Bearer)
+        Token: Access token JWT, tipo do token (Bearer) e refresh token
     """
 
-    user = session.scalar(select(User).where(User.email == form_data.username))
+    user = (
+        await session.execute(
+            select(*USER_TOKEN_COLUMNS, User.password).where(
+                func.lower(User.email) == form_data.username.lower()
+            )
+        )
+    ).first()
 
-    if not user:
+    valid, new_hash = await container.hasher.verify_and_update(
+        form_data.password, user.password if user else None
+    )
+    if not valid:
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect username or password',
         )
 
-    if not verify_password(form_data.password, user.password):
+    if new_hash is not None:
+        await session.execute(
+            update(User).where(User.id == user.id).values(password=new_hash)
+        )
+        invalidate_cached_user(container, user.id)
+
+    return await _issue_tokens(session, user, container)
+
+
+async def _issue_tokens(
+    session: AsyncSession, user: Row, container: Container
+) -> dict:
+    settings = container.settings
+    now = datetime.now(UTC).replace(tzinfo=None)
+    # Tokens expirados nunca mais são aceitos; removê-los a cada emissão,
+    # pelo índice em `expires_at`, mantém a tabela do tamanho dos tokens
+    # válidos sem uma tarefa periódica.
+    await session.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+    refresh_token = new_refresh_token()
+    session.add(
+        RefreshToken(
+            user_id=user.id,
+            token_hash=hash_refresh_token(refresh_token),
+            token_version=user.token_version,
+            expires_at=now
+            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    await session.commit()
+
+    access_token = create_access_token(
+        data=token_claims(user, settings.AUTH_STATELESS_TOKENS),
+        keys=container.token_keys,
+    )
+    return {
+        'access_token': access_token,
+        'token_type': 'Bearer',
+        'refresh_token': refresh_token,
+    }
+
+
+@app.post('/token/refresh', response_model=Token, status_code=HTTPStatus.OK)
+async def refresh_access_token(
+    payload: RefreshTokenSchema,
+    session: AsyncSession = Depends(get_session),
+    container: Container = Depends(get_container),
+):
+    """
+    Troca um refresh token por um novo par de tokens.
+
+    O refresh token é de uso único (rotação): é removido com um único
+    `DELETE ... RETURNING` e um novo é emitido junto com o access token.
+    A busca é feita pelo SHA-256 do token, sem Argon2, de modo que a
+    renovação custa apenas algumas consultas e uma assinatura. Como no
+    login, a emissão remove os refresh tokens expirados.
+
+    Args:
+        payload (RefreshTokenSchema): Refresh token recebido no login ou
+            na última renovação
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
+
+    Raises:
+        HTTPException: 401 UNAUTHORIZED se o refresh token é inválido,
+            expirado ou já foi usado
+        HTTPException: 401 UNAUTHORIZED se a senha mudou desde a emissão
+            ou o usuário não existe mais
+
+    Returns:
+        Token: Novo access token e novo refresh token
+    """
+    consumed = await session.execute(
+        delete(RefreshToken)
+        .where(
+            RefreshToken.token_hash
+            == hash_refresh_token(payload.refresh_token),
+            RefreshToken.expires_at > datetime.now(UTC).replace(tzinfo=None),
+        )
+        .returning(RefreshToken.user_id, RefreshToken.token_version)
+        .execution_options(synchronize_session=False)
+    )
+    consumed = consumed.first()
+
+    user = None
+    if consumed is not None:
+        user = (
+            await session.execute(
+                select(*USER_TOKEN_COLUMNS).where(User.id == consumed.user_id)
+            )
+        ).first()
+    if user is None or user.token_version != consumed.token_version:
+        await session.commit()
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
-            detail='Incorrect username or password',
+            detail='Invalid refresh token',
         )
 
-    access_token = create_access_token(data={'sub': user.email})
-
-    return {'access_token': access_token, 'token_type': 'Bearer'}
+    return await _issue_tokens(session, user, container)
@@ -0,0 +1,140 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração por tempo (TTL) e despejo LRU.
+
+    Cada entrada expira após `ttl` segundos; quando o cache atinge
+    `maxsize`, a entrada usada há mais tempo é descartada. Não é
+    thread-safe: pensado para uso dentro do event loop.
+
+    Args:
+        maxsize (int): Número máximo de entradas. `0` desabilita o cache
+        ttl (float): Tempo de vida padrão das entradas, em segundos
+        timer (Callable[[], float]): Relógio monotônico usado para expirar
+            as entradas. Defaults to time.monotonic.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retorna o valor associado à chave, se existir e não tiver expirado.
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at <= self._timer():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        """
+        Armazena um valor, opcionalmente com um TTL menor que o padrão.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+
+        self._data[key] = (self._timer() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove a chave do cache e retorna seu valor.
+        """
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Remove todas as entradas cujo valor satisfaz o predicado.
+
+        Returns:
+            int: Quantidade de entradas removidas
+        """
+        keys = [
+            key for key, (_, value) in self._data.items() if predicate(value)
+        ]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        """
+        Remove todas as entradas.
+        """
+        self._data.clear()
+
+
+class CachedCount:
+    """
+    Contagem em memória recarregada periodicamente.
+
+    Guarda o resultado de um `COUNT(*)` por até `ttl` segundos. Enquanto
+    válida, a contagem é ajustada pelas escritas do próprio processo
+    (`adjust`); escritas de outros processos só são refletidas na
+    próxima recarga, de modo que o valor é uma estimativa com defasagem
+    limitada pelo TTL.
+
+    Args:
+        ttl (float): Segundos até a contagem precisar ser recarregada.
+            `0` desabilita o cache
+        timer (Callable[[], float]): Relógio monotônico. Defaults to
+            time.monotonic.
+    """
+
+    def __init__(
+        self, ttl: float, timer: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self._timer = timer
+        self._value: int | None = None
+        self._expires_at = 0.0
+
+    def get(self) -> int | None:
+        """
+        Retorna a contagem, ou None se ainda não foi carregada ou expirou.
+        """
+        if self._value is None or self._expires_at <= self._timer():
+            return None
+        return self._value
+
+    def set(self, value: int):
+        """
+        Armazena uma contagem recém-carregada do banco.
+        """
+        if self.ttl <= 0:
+            return
+        self._value = value
+        self._expires_at = self._timer() + self.ttl
+
+    def adjust(self, delta: int):
+        """
+        Soma `delta` à contagem em cache, sem alterar sua validade.
+        """
+        if self._value is not None:
+            self._value = max(self._value + delta, 0)
@@ -0,0 +1,203 @@
+import zlib
+from dataclasses import dataclass
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+DEFAULT_CONTENT_TYPES = frozenset({
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/plain',
+})
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        chunk = self._compressor.process(data)
+        if final:
+            return chunk + self._compressor.finish()
+        return chunk + self._compressor.flush()
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    """
+    Regras de compressão das respostas HTTP.
+
+    Attributes:
+        encodings (tuple[str, ...]): Codificações oferecidas, em ordem de
+            preferência do servidor (`br`, `gzip`). Vazio desabilita
+        minimum_size (int): Respostas completas menores que isso (em
+            bytes) não são comprimidas
+        gzip_level (int): Nível do gzip (1 a 9)
+        brotli_quality (int): Qualidade do brotli (0 a 11)
+        content_types (frozenset[str]): Tipos de conteúdo comprimidos
+    """
+
+    encodings: tuple[str, ...] = ('br', 'gzip')
+    minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    content_types: frozenset[str] = DEFAULT_CONTENT_TYPES
+
+    @classmethod
+    def from_settings(cls, settings) -> 'CompressionPolicy':
+        """
+        Cria a política a partir das configurações `COMPRESSION_*`.
+        """
+        return cls(
+            encodings=tuple(settings.COMPRESSION_ENCODINGS),
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+            content_types=frozenset(settings.COMPRESSION_CONTENT_TYPES),
+        )
+
+    def negotiate(self, accept_encoding: str) -> str | None:
+        """
+        Escolhe a codificação a partir do `Accept-Encoding` do cliente.
+
+        Vence o maior peso `q` do cliente; em caso de empate, a ordem de
+        `encodings`. Codificações com `q=0` nunca são escolhidas.
+
+        Args:
+            accept_encoding (str): Valor do header `Accept-Encoding`
+
+        Returns:
+            str | None: Codificação escolhida, ou None para não comprimir
+        """
+        weights = {}
+        for item in accept_encoding.split(','):
+            name, _, params = item.partition(';')
+            weight = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    weight = float(params[2:])
+                except ValueError:
+                    weight = 0.0
+            weights[name.strip().lower()] = weight
+
+        chosen, chosen_weight = None, 0.0
+        for encoding in self.encodings:
+            weight = weights.get(encoding, weights.get('*', 0.0))
+            if weight > chosen_weight:
+                chosen, chosen_weight = encoding, weight
+        return chosen
+
+    def compressible(self, headers: Headers) -> bool:
+        """
+        Indica se uma resposta com esses headers pode ser comprimida.
+        """
+        if 'content-encoding' in headers:
+            return False
+        content_type = headers.get('content-type', '')
+        return content_type.partition(';')[0].strip() in self.content_types
+
+    def compressor(self, encoding: str):
+        """
+        Cria um compressor incremental para a codificação.
+
+        Args:
+            encoding (str): `br` ou `gzip`
+
+        Returns:
+            Compressor com `compress(data, final)`; chamadas não finais
+            liberam os bytes já comprimidos (flush), para streaming
+        """
+        if encoding == 'br':
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime respostas com brotli ou gzip.
+
+    A política vem de `app.state.container.compression`, criada a partir
+    das configurações no lifespan. Respostas completas abaixo de
+    `minimum_size`, sem corpo (como `304`), já codificadas ou de tipos
+    fora da lista não são alteradas. Respostas em streaming são
+    comprimidas bloco a bloco, com flush a cada bloco, para que o cliente
+    receba os dados à medida que são gerados.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        policy = scope['app'].state.container.compression
+        encoding = policy.negotiate(
+            Headers(scope=scope).get('accept-encoding', '')
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(
+            scope, receive, _CompressionResponder(policy, encoding, send)
+        )
+
+
+class _CompressionResponder:
+    def __init__(self, policy: CompressionPolicy, encoding: str, send):
+        self.policy = policy
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.headers = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message['type'] == 'http.response.start':
+            self.headers = MutableHeaders(raw=list(message['headers']))
+            self.start_message = {**message, 'headers': self.headers.raw}
+            if not self.policy.compressible(self.headers):
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.compressor is None:
+            self.headers.add_vary_header('Accept-Encoding')
+            if not more_body and len(body) < self.policy.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.compressor = self.policy.compressor(self.encoding)
+            self.headers['Content-Encoding'] = self.encoding
+            del self.headers['Content-Length']
+
+        body = self.compressor.compress(body, final=not more_body)
+        if self.start_message is not None:
+            # Corpo único: o tamanho comprimido já é conhecido
+            if not more_body:
+                self.headers['Content-Length'] = str(len(body))
+            await self.send(self.start_message)
+            self.start_message = None
+        await self.send({**message, 'body': body})
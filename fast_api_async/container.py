@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from fast_api_async.cache import CachedCount, TTLCache
+from fast_api_async.compression import CompressionPolicy
+from fast_api_async.database import (
+    PoolMetrics,
+    ReplicaRouter,
+    create_engine_from_settings,
+    instrument_pool,
+)
+from fast_api_async.hashing import PasswordHasher
+from fast_api_async.httpcache import MemoryResponseBackend, ResponseCache
+from fast_api_async.metrics import instrument_engine, observe_hashing
+from fast_api_async.profiling import QueryProfiler
+from fast_api_async.ratelimit import Limit, MemoryBackend, RateLimiter
+from fast_api_async.settings import Settings
+from fast_api_async.tokens import TokenKeys
+
+
+@dataclass
+class Container:
+    """
+    Recursos compartilhados da aplicação.
+
+    Reúne o engine, a fábrica de sessões, o serviço de hashing e os
+    caches em memória. É criado uma única vez no `lifespan` da aplicação
+    (nunca na importação dos módulos) e encerrado no shutdown.
+
+    Attributes:
+        settings (Settings): Configurações usadas para criar os recursos
+        engine (AsyncEngine): Engine assíncrono do banco de dados
+        pool_metrics (PoolMetrics): Métricas do pool de conexões
+        session_factory (async_sessionmaker): Fábrica de sessões
+        readonly_session_factory (async_sessionmaker): Fábrica de sessões
+            somente leitura, sem autoflush
+        replica_router (ReplicaRouter): Escolhe o engine das leituras
+            entre primário e réplicas
+        hasher (PasswordHasher): Serviço de hashing de senhas
+        principal_cache (TTLCache): Cache de `CurrentUser` por token
+        token_versions (TTLCache): Cache da versão de token por usuário
+        token_keys (TokenKeys): Chaves de assinatura dos tokens JWT
+        user_count (CachedCount): Total de usuários usado nas listagens
+        response_cache (ResponseCache): Respostas das listagens com ETag
+        compression (CompressionPolicy): Regras de compressão das
+            respostas
+        login_limiter (RateLimiter): Limites de tentativas de login por IP
+            e por conta
+    """
+
+    settings: Settings
+    engine: AsyncEngine
+    pool_metrics: PoolMetrics
+    session_factory: async_sessionmaker
+    readonly_session_factory: async_sessionmaker
+    replica_router: ReplicaRouter
+    hasher: PasswordHasher
+    principal_cache: TTLCache
+    token_versions: TTLCache
+    token_keys: TokenKeys
+    user_count: CachedCount
+    response_cache: ResponseCache
+    compression: CompressionPolicy
+    login_limiter: RateLimiter
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'Container':
+        """
+        Cria todos os recursos da aplicação a partir das configurações.
+
+        Args:
+            settings (Settings): Configurações da aplicação
+
+        Returns:
+            Container: Container pronto para uso
+        """
+        engine = create_engine_from_settings(settings)
+        replicas = [
+            create_engine_from_settings(settings, url)
+            for url in settings.DATABASE_REPLICA_URLS
+        ]
+        for each in (engine, *replicas):
+            instrument_engine(each)
+            if settings.QUERY_PROFILER_ENABLED:
+                QueryProfiler.from_settings(settings).attach(each)
+        return cls(
+            settings=settings,
+            engine=engine,
+            pool_metrics=instrument_pool(engine),
+            session_factory=async_sessionmaker(engine, expire_on_commit=False),
+            readonly_session_factory=async_sessionmaker(
+                engine, expire_on_commit=False, autoflush=False
+            ),
+            replica_router=ReplicaRouter(
+                engine,
+                replicas,
+                pin_seconds=settings.DATABASE_REPLICA_PIN_SECONDS,
+                retry_seconds=settings.DATABASE_REPLICA_RETRY_SECONDS,
+            ),
+            hasher=PasswordHasher(
+                max_workers=settings.HASHING_MAX_WORKERS,
+                max_concurrency=settings.HASHING_MAX_CONCURRENCY,
+                bulk_concurrency=settings.HASHING_BULK_MAX_CONCURRENCY,
+                observer=observe_hashing,
+            ),
+            principal_cache=TTLCache(
+                maxsize=settings.AUTH_CACHE_MAX_SIZE,
+                ttl=settings.AUTH_CACHE_TTL_SECONDS,
+            ),
+            token_versions=TTLCache(
+                maxsize=settings.AUTH_CACHE_MAX_SIZE,
+                ttl=settings.AUTH_CACHE_TTL_SECONDS,
+            ),
+            token_keys=TokenKeys.from_settings(settings),
+            user_count=CachedCount(ttl=settings.USER_COUNT_TTL_SECONDS),
+            response_cache=ResponseCache(
+                MemoryResponseBackend(
+                    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+                )
+            ),
+            compression=CompressionPolicy.from_settings(settings),
+            login_limiter=RateLimiter(
+                MemoryBackend(),
+                {
+                    'ip': Limit(
+                        settings.LOGIN_RATE_LIMIT_PER_IP,
+                        settings.LOGIN_RATE_LIMIT_PERIOD_SECONDS,
+                    ),
+                    'account': Limit(
+                        settings.LOGIN_RATE_LIMIT_PER_ACCOUNT,
+                        settings.LOGIN_RATE_LIMIT_PERIOD_SECONDS,
+                    ),
+                },
+                prefix='login',
+            ),
+        )
+
+    async def start(self):
+        """
+        Prepara os recursos no event loop do worker, no início do lifespan.
+
+        Ajusta o threadpool e gera o hash descartável do serviço de
+        hashing, de modo que todo login custe uma única verificação.
+        """
+        self.configure_threadpool()
+        await self.hasher.prepare()
+
+    def configure_threadpool(self):
+        """
+        Ajusta o threadpool do anyio ao tamanho do pool de conexões.
+
+        Dependências e respostas síncronas rodam nesse threadpool; threads
+        além das conexões disponíveis só aguardariam no pool do banco.
+        Deve ser chamado dentro do event loop de cada worker.
+        """
+        size = self.settings.THREADPOOL_SIZE
+        if size is None:
+            size = (
+                self.settings.DATABASE_POOL_SIZE
+                + self.settings.DATABASE_MAX_OVERFLOW
+            )
+        current_default_thread_limiter().total_tokens = size
+
+    async def aclose(self):
+        """
+        Encerra o pool de hashing e fecha as conexões dos engines.
+        """
+        self.hasher.shutdown()
+        await self.engine.dispose()
+        for replica in self.replica_router.replicas:
+            await replica.dispose()
+
+
+def get_container(request: Request) -> Container:
+    """
+    Retorna o container da aplicação que atende a requisição.
+    """
+    return request.app.state.container
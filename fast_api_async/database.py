@@ -1,14 +1,323 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+import math
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from itertools import cycle
+from time import perf_counter
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
 
 from fast_api_async.settings import Settings
 
-engine = create_engine(Settings().DATABASE_URL)
+PIN_COOKIE = 'replica_pin'
+
+ReadSessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+@dataclass
+class PoolMetrics:
+    """
+    Connection pool counters for a single engine.
+
+    Checkouts, checkins, connects and invalidations are collected from
+    pool events; wait time and timeouts are recorded by `get_session`
+    when it acquires the request connection.
+    """
+
+    engine: AsyncEngine
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def observe_wait(self, seconds: float):
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters plus the current pool gauges.
+        """
+        pool = self.engine.pool
+        gauges = {}
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            gauge = getattr(pool, name, None)
+            if gauge is not None:
+                gauges[name] = gauge()
+
+        return {
+            **gauges,
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'invalidations': self.invalidations,
+            'timeouts': self.timeouts,
+            'wait_seconds_total': self.wait_seconds_total,
+            'wait_seconds_max': self.wait_seconds_max,
+        }
+
+
+def instrument_pool(engine: AsyncEngine) -> PoolMetrics:
+    """
+    Attaches pool event listeners to the engine and returns its metrics.
+    """
+    metrics = PoolMetrics(engine)
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(pool, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+
+    @event.listens_for(pool, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.checkins += 1
+
+    @event.listens_for(pool, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+    return metrics
+
+
+def _sqlite_pragmas(settings: Settings, in_memory: bool):
+    pragmas = {
+        'synchronous': 'NORMAL',
+        'busy_timeout': settings.SQLITE_BUSY_TIMEOUT_MS,
+        'mmap_size': settings.SQLITE_MMAP_SIZE,
+    }
+    if not in_memory:
+        pragmas = {'journal_mode': 'WAL', **pragmas}
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    return set_sqlite_pragmas
+
+
+def create_engine_from_settings(
+    settings: Settings, url: str | None = None
+) -> AsyncEngine:
+    """
+    Creates the async engine with the pool options from settings.
+
+    SQLite connections get WAL journaling, `synchronous=NORMAL`, a busy
+    timeout and memory-mapped I/O on connect; in-memory databases use a
+    single shared connection. For other backends the queue pool is sized
+    from settings and, on asyncpg, a server-side statement timeout is set.
+    `url` overrides `DATABASE_URL`, e.g. for read replicas.
+    """
+    url = make_url(url or settings.DATABASE_URL)
+    options = {
+        'echo': settings.DATABASE_ECHO,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+    }
+
+    is_sqlite = url.get_backend_name() == 'sqlite'
+    in_memory = is_sqlite and url.database in {None, '', ':memory:'}
+    if in_memory:
+        options['poolclass'] = StaticPool
+    else:
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+
+    timeout = settings.DATABASE_STATEMENT_TIMEOUT_MS
+    if timeout is not None and url.get_driver_name() == 'asyncpg':
+        options['connect_args'] = {
+            'server_settings': {'statement_timeout': str(timeout)}
+        }
+
+    engine = create_async_engine(url, **options)
+    if is_sqlite:
+        event.listen(
+            engine.sync_engine,
+            'connect',
+            _sqlite_pragmas(settings, in_memory),
+        )
+    return engine
+
 
+class ReplicaRouter:
+    """
+    Picks the engine that serves read-only sessions.
+
+    Reads go to the replicas round-robin. A replica that fails to connect
+    is marked down and skipped for `retry_seconds`; with no healthy
+    replica, reads fall back to the primary.
 
-def get_session():
+    After a write, `pin` stores the write time in a cookie on the
+    response. Requests carrying a cookie younger than `pin_seconds` read
+    from the primary, so clients see their own writes despite
+    replication lag. The pin travels with the client rather than living
+    in a worker, so it holds whichever worker serves the next request;
+    clients that do not send cookies back get no read-your-writes.
+    Cookie timestamps are wall-clock time, so `timer` is too.
     """
-    Returns a new SQLAlchemy session.
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        pin_seconds: float,
+        retry_seconds: float,
+        timer=time.time,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.pin_seconds = pin_seconds
+        self.retry_seconds = retry_seconds
+        self._timer = timer
+        self._cycle = cycle(replicas)
+        self._down_until: dict[AsyncEngine, float] = {}
+
+    def pin(self, response: Response):
+        """
+        Sends the client's reads to the primary for the pin window.
+        """
+        if self.replicas:
+            response.set_cookie(
+                PIN_COOKIE,
+                f'{self._timer():.3f}',
+                max_age=math.ceil(self.pin_seconds),
+                httponly=True,
+                samesite='lax',
+            )
+
+    def pinned(self, request: Request) -> bool:
+        """
+        Tells whether the request carries a pin that is still valid.
+
+        The write time is checked in both directions, so a forged future
+        timestamp pins for at most `pin_seconds`.
+        """
+        try:
+            written_at = float(request.cookies[PIN_COOKIE])
+        except (KeyError, ValueError):
+            return False
+        return abs(self._timer() - written_at) <= self.pin_seconds
+
+    def read_engine(self, pinned: bool = False) -> AsyncEngine:
+        """
+        Returns the engine for a read, honoring pins and replica health.
+        """
+        if pinned:
+            return self.primary
+
+        now = self._timer()
+        for _ in self.replicas:
+            engine = next(self._cycle)
+            if self._down_until.get(engine, 0) <= now:
+                return engine
+        return self.primary
+
+    def mark_down(self, engine: AsyncEngine):
+        """
+        Takes a replica out of rotation for `retry_seconds`.
+        """
+        if engine is not self.primary:
+            self._down_until[engine] = self._timer() + self.retry_seconds
+
+
+@asynccontextmanager
+async def _request_session(container, session_factory):
+    async with session_factory() as session:
+        start = perf_counter()
+        try:
+            await session.connection()
+        except PoolTimeoutError:
+            container.pool_metrics.timeouts += 1
+            raise
+        container.pool_metrics.observe_wait(perf_counter() - start)
+        yield session
+
+
+async def get_session(request: Request):
+    """
+    Returns a new SQLAlchemy async session.
+
+    The session comes from the factory of the application container. The
+    request connection is checked out up front so the time spent waiting
+    on the pool (and pool timeouts) can be recorded.
     """
-    with Session(engine) as session:
+    container = request.app.state.container
+    async with _request_session(
+        container, container.session_factory
+    ) as session:
         yield session
+
+
+@asynccontextmanager
+async def read_session(container, pinned: bool = False):
+    """
+    Opens a read-only session on a replica (or on the primary).
+
+    Uses the read-only factory (no autoflush, no expiration on commit)
+    bound to the engine chosen by the container's `ReplicaRouter`. If the
+    replica cannot be reached it is marked down and the session is opened
+    on the primary instead.
+    """
+    router = container.replica_router
+    engine = router.read_engine(pinned)
+    if engine is not router.primary:
+        async with container.readonly_session_factory(bind=engine) as session:
+            try:
+                await session.connection()
+            except (DBAPIError, OSError):
+                router.mark_down(engine)
+            else:
+                yield session
+                return
+
+    async with _request_session(
+        container, container.readonly_session_factory
+    ) as session:
+        yield session
+
+
+def get_session_factory(request: Request):
+    """
+    Returns the async session factory of the application container.
+
+    Used by work that outlives the request dependencies, such as streaming
+    responses, which must open (and close) their own session.
+    """
+    return request.app.state.container.session_factory
+
+
+def read_session_factory(
+    container, pinned: bool = False
+) -> ReadSessionFactory:
+    """
+    Returns a callable that opens a routed read-only session.
+
+    The lazy counterpart of `read_session`, for work that opens its own
+    session (streaming responses) or only needs one on some paths (cache
+    misses). The engine is chosen, and replica failover applied, when the
+    session is opened.
+    """
+    return partial(read_session, container, pinned)
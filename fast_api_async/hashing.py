@@ -0,0 +1,252 @@
+import asyncio
+import multiprocessing
+import os
+import secrets
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cache, partial
+from time import perf_counter
+
+from pwdlib import PasswordHash
+
+
+@cache
+def get_pwd_context() -> PasswordHash:
+    """
+    Retorna o contexto de hashing (Argon2) do processo atual.
+
+    O contexto é criado sob demanda e reaproveitado, tanto no processo
+    principal quanto em cada worker do pool de processos.
+
+    Returns:
+        PasswordHash: Contexto com as configurações recomendadas do pwdlib
+    """
+    return PasswordHash.recommended()
+
+
+def _hash(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+@dataclass(frozen=True)
+class HasherStats:
+    """
+    Fotografia das métricas do serviço de hashing.
+
+    Attributes:
+        max_concurrency (int): Número máximo de operações simultâneas
+        in_flight (int): Operações em execução no pool
+        waiting (int): Operações aguardando uma vaga (profundidade da fila)
+        completed (int): Total de operações concluídas
+    """
+
+    max_concurrency: int
+    in_flight: int
+    waiting: int
+    completed: int
+
+
+class PasswordHasher:
+    """
+    Serviço assíncrono de hashing de senhas.
+
+    Executa o Argon2 em um `ProcessPoolExecutor`, liberando o event loop
+    e distribuindo o custo de CPU entre os núcleos. Um semáforo limita
+    quantas operações podem estar no pool ao mesmo tempo; as demais
+    aguardam na fila e são contabilizadas em `stats()`.
+
+    Os hashes de importações em lote (`hash_many`) passam antes por um
+    segundo semáforo, menor, para que um lote grande nunca ocupe todas as
+    vagas do pool e deixe os logins esperando atrás dele.
+
+    Args:
+        max_workers (int | None): Número de processos do pool. `None` usa
+            a quantidade de CPUs; `0` executa no threadpool padrão do loop
+            (útil em testes e ambientes sem suporte a processos).
+        max_concurrency (int | None): Limite de operações simultâneas.
+            Defaults to o número de workers.
+        bulk_concurrency (int | None): Limite de operações simultâneas de
+            `hash_many`, dentro de `max_concurrency`. Defaults to metade
+            de `max_concurrency` (no mínimo 1).
+        observer (Callable | None): Chamado ao fim de cada operação com
+            `(operation, queue_wait, duration)`, em segundos.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_concurrency: int | None = None,
+        bulk_concurrency: int | None = None,
+        observer: Callable[[str, float, float], None] | None = None,
+    ):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max(max_workers, 1)
+        self._executor: Executor | None = None
+        self.bulk_concurrency = bulk_concurrency or max(
+            self.max_concurrency // 2, 1
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bulk_semaphore = asyncio.Semaphore(self.bulk_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._completed = 0
+        self._observer = observer
+        self._dummy_hash: str | None = None
+
+    def _get_executor(self) -> Executor | None:
+        if self.max_workers == 0:
+            return None
+        if self._executor is None:
+            # `spawn` evita herdar threads e conexões do processo da API
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    async def _run(self, operation: str, func, *args):
+        queued_at = perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        started_at = perf_counter()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), partial(func, *args)
+            )
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._semaphore.release()
+            if self._observer is not None:
+                self._observer(
+                    operation,
+                    started_at - queued_at,
+                    perf_counter() - started_at,
+                )
+
+    async def hash(self, password: str) -> str:
+        """
+        Gera o hash Argon2 da senha fora do event loop.
+
+        Args:
+            password (str): Senha em texto plano
+
+        Returns:
+            str: Hash da senha
+        """
+        return await self._run('hash', _hash, password)
+
+    async def hash_many(self, passwords: Iterable[str]) -> list[str]:
+        """
+        Gera os hashes de um lote de senhas, como em uma importação.
+
+        No máximo `bulk_concurrency` senhas do lote (somadas às de outros
+        lotes) ocupam o pool ao mesmo tempo; o restante das vagas fica
+        livre para logins e cadastros individuais.
+
+        Args:
+            passwords (Iterable[str]): Senhas em texto plano
+
+        Returns:
+            list[str]: Hashes, na ordem das senhas
+        """
+
+        async def hash_one(password: str) -> str:
+            async with self._bulk_semaphore:
+                return await self.hash(password)
+
+        return await asyncio.gather(*map(hash_one, passwords))
+
+    async def prepare(self):
+        """
+        Gera o hash descartável usado nos logins de usuários inexistentes.
+
+        Chamado na inicialização da aplicação, para que nem o primeiro
+        login com um email desconhecido pague um hash além da
+        verificação.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe())
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verifica a senha contra o hash armazenado fora do event loop.
+
+        Args:
+            plain_password (str): Senha em texto plano
+            hashed_password (str): Hash armazenado no banco
+
+        Returns:
+            bool: True se a senha corresponde ao hash
+        """
+        return await self._run(
+            'verify', _verify, plain_password, hashed_password
+        )
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str | None
+    ) -> tuple[bool, str | None]:
+        """
+        Verifica a senha e, se necessário, gera um hash atualizado.
+
+        Com `hashed_password` nulo (usuário inexistente), verifica contra
+        o hash descartável gerado em `prepare` e retorna falso: a
+        tentativa custa o mesmo Argon2 de uma senha errada, sem revelar
+        pelo tempo de resposta se a conta existe.
+
+        Args:
+            plain_password (str): Senha em texto plano
+            hashed_password (str | None): Hash armazenado no banco
+
+        Returns:
+            tuple[bool, str | None]: Se a senha corresponde e, quando o
+            hash usa parâmetros desatualizados, o novo hash a persistir
+        """
+        if hashed_password is None:
+            await self.prepare()
+            await self._run(
+                'verify', _verify, plain_password, self._dummy_hash
+            )
+            return False, None
+
+        return await self._run(
+            'verify', _verify_and_update, plain_password, hashed_password
+        )
+
+    def stats(self) -> HasherStats:
+        """
+        Retorna as métricas atuais de concorrência e fila do serviço.
+        """
+        return HasherStats(
+            max_concurrency=self.max_concurrency,
+            in_flight=self._in_flight,
+            waiting=self._waiting,
+            completed=self._completed,
+        )
+
+    def shutdown(self, wait: bool = True):
+        """
+        Encerra o pool de processos, se tiver sido criado.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
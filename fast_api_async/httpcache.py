@@ -0,0 +1,184 @@
+import hashlib
+import secrets
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Protocol
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from fast_api_async.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """
+    Corpo serializado de uma resposta em cache e seu ETag.
+
+    Attributes:
+        body (bytes): Corpo JSON já serializado
+        etag (str): ETag fraco da resposta
+    """
+
+    body: bytes
+    etag: str
+
+
+class ResponseCacheBackend(Protocol):
+    """
+    Armazenamento das respostas em cache e das versões das tabelas.
+
+    A implementação em memória atende um único processo; um backend
+    compartilhado (por exemplo, Redis com `INCR` para as versões) faz
+    com que a escrita em um worker invalide o cache de todos.
+    """
+
+    async def get(self, key: str) -> CachedResponse | None: ...
+
+    async def set(self, key: str, response: CachedResponse): ...
+
+    async def version(self, table: str) -> str:
+        """
+        Retorna a versão atual da tabela, usada nas chaves do cache.
+        """
+        ...
+
+    async def bump(self, table: str):
+        """
+        Avança a versão da tabela, invalidando as respostas derivadas dela.
+        """
+        ...
+
+
+class MemoryResponseBackend:
+    """
+    Respostas e versões de tabelas em memória, para um único processo.
+
+    As versões levam um prefixo aleatório por processo, para que ETags de
+    workers diferentes nunca coincidam; as respostas expiram após `ttl`
+    segundos, limitando o tempo em que um worker serve dados alterados
+    por outro.
+
+    Args:
+        max_entries (int): Número máximo de respostas mantidas. `0`
+            desabilita o armazenamento (os ETags continuam válidos)
+        ttl (float): Tempo de vida das respostas, em segundos
+        timer (Callable[[], float]): Relógio monotônico. Defaults to
+            time.monotonic.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 60,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self._responses = TTLCache(maxsize=max_entries, ttl=ttl, timer=timer)
+        self._epoch = secrets.token_hex(4)
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> CachedResponse | None:
+        return self._responses.get(key)
+
+    async def set(self, key: str, response: CachedResponse):
+        self._responses.set(key, response)
+
+    async def version(self, table: str) -> str:
+        return f'{self._epoch}.{self._versions.get(table, 0)}'
+
+    async def bump(self, table: str):
+        self._versions[table] = self._versions.get(table, 0) + 1
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    # Comparação fraca (RFC 9110): o prefixo `W/` é ignorado
+    tag = etag.removeprefix('W/')
+    return any(
+        candidate.strip().removeprefix('W/') == tag
+        for candidate in if_none_match.split(',')
+    )
+
+
+class ResponseCache:
+    """
+    Cache de respostas GET com ETag e requisições condicionais.
+
+    A chave combina a versão da tabela, o caminho e os parâmetros de
+    consulta ordenados; toda escrita na tabela avança a versão, de modo
+    que as respostas antigas deixam de ser encontradas sem varredura. O
+    ETag deriva da chave (e portanto da versão) e do corpo; um
+    `If-None-Match` correspondente recebe `304 Not Modified` sem corpo.
+
+    Args:
+        backend (ResponseCacheBackend): Armazenamento das respostas
+    """
+
+    def __init__(self, backend: ResponseCacheBackend):
+        self.backend = backend
+
+    async def key(self, table: str, request: Request) -> str:
+        """
+        Monta a chave da requisição na versão atual da tabela.
+
+        Args:
+            table (str): Tabela da qual a resposta depende
+            request (Request): Requisição GET
+
+        Returns:
+            str: Chave do cache
+        """
+        version = await self.backend.version(table)
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f'{table}:{version}:{request.url.path}?{query}'
+
+    async def get(self, key: str) -> CachedResponse | None:
+        return await self.backend.get(key)
+
+    async def store(self, key: str, body: bytes) -> CachedResponse:
+        """
+        Armazena um corpo serializado e calcula seu ETag.
+
+        Args:
+            key (str): Chave obtida com `key`
+            body (bytes): Corpo JSON da resposta
+
+        Returns:
+            CachedResponse: Resposta armazenada
+        """
+        digest = hashlib.blake2b(key.encode() + body, digest_size=12)
+        response = CachedResponse(body, f'W/"{digest.hexdigest()}"')
+        await self.backend.set(key, response)
+        return response
+
+    async def invalidate(self, table: str):
+        """
+        Invalida todas as respostas derivadas da tabela.
+        """
+        await self.backend.bump(table)
+
+    @staticmethod
+    def respond(cached: CachedResponse, request: Request) -> Response:
+        """
+        Responde com o corpo em cache ou `304` se o cliente já o possui.
+
+        Args:
+            cached (CachedResponse): Resposta em cache
+            request (Request): Requisição, com o `If-None-Match` opcional
+
+        Returns:
+            Response: `200` com o corpo ou `304 Not Modified`, ambos com
+            `ETag` e `Cache-Control: private, no-cache`
+        """
+        headers = {'ETag': cached.etag, 'Cache-Control': 'private, no-cache'}
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and _etag_matches(if_none_match, cached.etag):
+            return Response(
+                status_code=HTTPStatus.NOT_MODIFIED, headers=headers
+            )
+        return Response(
+            cached.body, media_type='application/json', headers=headers
+        )
@@ -0,0 +1,231 @@
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from anyio.to_thread import current_default_thread_limiter
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import Match
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Latência das requisições HTTP por rota',
+    ['method', 'route', 'status'],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requisições HTTP em andamento'
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds',
+    'Tempo gasto no banco de dados por requisição',
+    ['method', 'route'],
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Quantidade de consultas ao banco por requisição',
+    ['method', 'route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+REQUEST_HASHING_SECONDS = Histogram(
+    'http_request_hashing_seconds',
+    'Tempo gasto com Argon2 (incluindo fila) por requisição',
+    ['method', 'route'],
+)
+HASHING_SECONDS = Histogram(
+    'password_hashing_seconds',
+    'Duração das operações de Argon2 no pool',
+    ['operation'],
+)
+HASHING_QUEUE_WAIT_SECONDS = Histogram(
+    'password_hashing_queue_wait_seconds',
+    'Tempo aguardando uma vaga no pool de hashing',
+    ['operation'],
+)
+DB_QUERIES = Counter('db_queries_total', 'Consultas emitidas ao banco')
+
+
+@dataclass
+class RequestStats:
+    """
+    Custos acumulados durante uma requisição.
+
+    Attributes:
+        method (str): Método HTTP da requisição
+        path (str): Caminho da requisição
+        db_seconds (float): Tempo de execução de statements no banco
+        db_queries (int): Quantidade de statements executados
+        hashing_seconds (float): Tempo gasto com Argon2, incluindo fila
+        statements (Counter): Execuções por statement, preenchido pelo
+            profiler de consultas quando habilitado
+    """
+
+    method: str = ''
+    path: str = ''
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    hashing_seconds: float = 0.0
+    statements: StatementCounter = field(default_factory=StatementCounter)
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    'request_stats', default=None
+)
+
+
+def current_request_stats() -> RequestStats | None:
+    """
+    Retorna as estatísticas da requisição em andamento, se houver.
+    """
+    return _request_stats.get()
+
+
+def observe_hashing(operation: str, queue_wait: float, duration: float):
+    """
+    Registra uma operação de hashing e a atribui à requisição atual.
+
+    Args:
+        operation (str): `hash` ou `verify`
+        queue_wait (float): Segundos aguardando uma vaga no pool
+        duration (float): Segundos de execução no pool
+    """
+    HASHING_QUEUE_WAIT_SECONDS.labels(operation).observe(queue_wait)
+    HASHING_SECONDS.labels(operation).observe(duration)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.hashing_seconds += queue_wait + duration
+
+
+def instrument_engine(engine: AsyncEngine):
+    """
+    Contabiliza tempo e quantidade de statements do engine por requisição.
+
+    Args:
+        engine (AsyncEngine): Engine a ser instrumentado
+    """
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        conn.info.setdefault('query_start', []).append(perf_counter())
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, *args):
+        elapsed = perf_counter() - conn.info['query_start'].pop()
+        DB_QUERIES.inc()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.db_seconds += elapsed
+            stats.db_queries += 1
+
+
+def _route_path(scope) -> str:
+    route = scope.get('route')
+    if route is not None:
+        return route.path
+
+    for route in scope['app'].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP.
+
+    Registra latência por rota (pelo template da rota, não pelo caminho
+    bruto), requisições em andamento e, via `RequestStats`, o tempo e a
+    quantidade de consultas ao banco e o tempo gasto com Argon2.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(method=scope['method'], path=scope['path'])
+        token = _request_stats.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+
+            method = scope['method']
+            route = _route_path(scope)
+            REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+            REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.db_queries)
+            REQUEST_HASHING_SECONDS.labels(method, route).observe(
+                stats.hashing_seconds
+            )
+
+
+class ContainerCollector:
+    """
+    Coletor Prometheus dos recursos do container da aplicação.
+
+    Expõe, no momento da coleta, o estado do pool de conexões, da fila
+    de hashing e do threadpool do anyio (onde rodam dependências
+    síncronas). Deve ser coletado dentro do event loop da aplicação.
+
+    Args:
+        container (Container): Container da aplicação
+    """
+
+    def __init__(self, container):
+        self.container = container
+
+    def collect(self):
+        pool = GaugeMetricFamily(
+            'db_pool', 'Estado do pool de conexões', labels=['metric']
+        )
+        for name, value in self.container.pool_metrics.snapshot().items():
+            pool.add_metric([name], value)
+        yield pool
+
+        hasher = self.container.hasher.stats()
+        yield GaugeMetricFamily(
+            'password_hashing_in_flight',
+            'Operações de hashing em execução',
+            value=hasher.in_flight,
+        )
+        yield GaugeMetricFamily(
+            'password_hashing_waiting',
+            'Operações de hashing na fila',
+            value=hasher.waiting,
+        )
+
+        threadpool = current_default_thread_limiter().statistics()
+        yield GaugeMetricFamily(
+            'threadpool_tokens_total',
+            'Tamanho do threadpool do anyio',
+            value=threadpool.total_tokens,
+        )
+        yield GaugeMetricFamily(
+            'threadpool_tokens_borrowed',
+            'Threads do anyio em uso',
+            value=threadpool.borrowed_tokens,
+        )
+        yield GaugeMetricFamily(
+            'threadpool_tasks_waiting',
+            'Tarefas aguardando uma thread do anyio',
+            value=threadpool.tasks_waiting,
+        )
@@ -1,10 +1,24 @@
 from datetime import datetime
 
-from sqlalchemy import func
+from sqlalchemy import DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column, registry
 
 table_registry = registry()
 
+# O SQLite grava `CURRENT_TIMESTAMP` sem fração de segundo; gravar (e
+# comparar) os parâmetros no mesmo formato mantém filtros por intervalo e
+# cursores de paginação por `created_at` corretos.
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format=(
+            '%(year)04d-%(month)02d-%(day)02d '
+            '%(hour)02d:%(minute)02d:%(second)02d'
+        )
+    ),
+    'sqlite',
+)
+
 
 @table_registry.mapped_as_dataclass
 class User:
@@ -14,6 +28,38 @@ class User:
     username: Mapped[str] = mapped_column(unique=True)
     email: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
+    token_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        Timestamp, init=False, server_default=func.now()
+    )
+
+
+# Login por email sem diferenciar maiúsculas (e unicidade no mesmo
+# critério), listagens por data de cadastro e filtro por prefixo de
+# username no PostgreSQL (LIKE 'abc%' só usa índice com text_pattern_ops).
+Index('ix_users_email_lower', func.lower(User.email), unique=True)
+Index('ix_users_created_at_id', User.created_at, User.id)
+Index(
+    'ix_users_username_pattern',
+    User.username,
+    postgresql_ops={'username': 'text_pattern_ops'},
+).ddl_if(dialect='postgresql')
+
+
+@table_registry.mapped_as_dataclass
+class RefreshToken:
+    __tablename__ = 'refresh_tokens'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
+    token_hash: Mapped[str] = mapped_column(unique=True)
+    token_version: Mapped[int]
+    # Usado na remoção dos tokens expirados a cada emissão
+    expires_at: Mapped[datetime] = mapped_column(index=True)
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -0,0 +1,40 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Codifica a posição da última linha de uma página em um cursor opaco.
+
+    Args:
+        values (list): Valores das colunas de ordenação da última linha
+
+    Returns:
+        str: Cursor em base64 url-safe
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor opaco recebido do cliente
+
+    Raises:
+        ValueError: Se o cursor estiver malformado
+
+    Returns:
+        list: Valores das colunas de ordenação da última linha
+    """
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (BinasciiError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
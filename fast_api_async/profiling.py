@@ -0,0 +1,162 @@
+import logging
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from fast_api_async.metrics import current_request_stats
+from fast_api_async.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+
+def redact_parameters(parameters) -> str:
+    """
+    Descreve os parâmetros de um statement sem expor seus valores.
+
+    Args:
+        parameters: Parâmetros enviados ao driver (sequência, mapeamento
+            ou lista deles, em executemany)
+
+    Returns:
+        str: Estrutura dos parâmetros com os valores mascarados
+    """
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key}: ?' for key in parameters) + '}'
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f'[{len(parameters)} parameter sets]'
+        return '(' + ', '.join('?' for _ in parameters) + ')'
+    return '?'
+
+
+def _log_slow_query(statement, parameters, elapsed_ms):
+    logger.warning(
+        'Slow query (%.1f ms): %s -- params: %s',
+        elapsed_ms,
+        ' '.join(statement.split()),
+        redact_parameters(parameters),
+    )
+
+
+class QueryProfiler:
+    """
+    Profiler opcional de consultas SQL anexado a um engine.
+
+    Loga statements mais lentos que o limite configurado (com parâmetros
+    mascarados) e, opcionalmente, seu plano de execução. Dentro de uma
+    requisição, avisa quando o total de consultas passa do orçamento e
+    quando o mesmo statement se repete muitas vezes (padrão N+1).
+
+    Args:
+        slow_query_ms (float): Duração a partir da qual um statement é
+            considerado lento
+        query_budget (int | None): Máximo de consultas por requisição
+        repeat_threshold (int | None): Máximo de execuções do mesmo
+            statement por requisição antes de avisar sobre N+1
+        explain (bool): Loga o plano de execução dos statements lentos
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float,
+        query_budget: int | None = None,
+        repeat_threshold: int | None = None,
+        explain: bool = False,
+    ):
+        self.slow_query_ms = slow_query_ms
+        self.query_budget = query_budget
+        self.repeat_threshold = repeat_threshold
+        self.explain = explain
+        self._explained: set[str] = set()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'QueryProfiler':
+        return cls(
+            slow_query_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            query_budget=settings.QUERY_BUDGET_PER_REQUEST,
+            repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+            explain=settings.QUERY_PROFILER_EXPLAIN,
+        )
+
+    def attach(self, engine: AsyncEngine):
+        """
+        Registra os listeners do profiler no engine.
+        """
+        sync_engine = engine.sync_engine
+        explain_prefix = EXPLAIN_PREFIXES.get(sync_engine.dialect.name)
+
+        @event.listens_for(sync_engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, *args):
+            conn.info.setdefault('profiler_start', []).append(perf_counter())
+
+        @event.listens_for(sync_engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, *args):
+            *_, executemany = args
+            elapsed_ms = (
+                perf_counter() - conn.info['profiler_start'].pop()
+            ) * 1000
+            if elapsed_ms >= self.slow_query_ms:
+                _log_slow_query(statement, parameters, elapsed_ms)
+                if (
+                    self.explain
+                    and explain_prefix
+                    and not executemany
+                    and statement not in self._explained
+                ):
+                    self._explain(conn, explain_prefix, statement, parameters)
+
+            self._track_request(statement)
+
+    def _explain(self, conn, prefix, statement, parameters):
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return
+
+        self._explained.add(statement)
+        # Cursor do DBAPI: não dispara eventos nem interfere no resultado
+        # ainda pendente do statement original.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = '\n'.join(' '.join(map(str, row)) for row in cursor)
+        except Exception:  # noqa: BLE001
+            logger.exception('Could not explain query: %s', statement)
+            return
+        finally:
+            cursor.close()
+
+        logger.warning('Query plan for %s\n%s', statement, plan)
+
+    def _track_request(self, statement):
+        stats = current_request_stats()
+        if stats is None:
+            return
+
+        stats.statements[statement] += 1
+        total = stats.statements.total()
+        if self.query_budget is not None and total == self.query_budget + 1:
+            logger.warning(
+                'Request %s %s exceeded the query budget of %d queries',
+                stats.method,
+                stats.path,
+                self.query_budget,
+            )
+
+        repeats = stats.statements[statement]
+        if (
+            self.repeat_threshold is not None
+            and repeats == self.repeat_threshold + 1
+        ):
+            logger.warning(
+                'Possible N+1 in %s %s: statement executed %d times: %s',
+                stats.method,
+                stats.path,
+                repeats,
+                ' '.join(statement.split()),
+            )
@@ -0,0 +1,137 @@
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+
+class RateLimitBackend(Protocol):
+    """
+    Armazenamento dos buckets de rate limiting.
+
+    A implementação em memória atende um único processo; um backend
+    compartilhado (por exemplo, Redis com um script atômico) aplica os
+    mesmos limites a todos os workers.
+    """
+
+    async def consume(
+        self, key: str, capacity: int, refill_per_second: float
+    ) -> float:
+        """
+        Consome um token do bucket da chave.
+
+        Returns:
+            float: 0 se havia token disponível; caso contrário, segundos
+            até o próximo token
+        """
+        ...
+
+
+class MemoryBackend:
+    """
+    Token buckets em memória, para um único processo.
+
+    Cada chave guarda apenas `(tokens, atualizado_em)`; o reabastecimento
+    é calculado sob demanda. Chaves além de `max_keys` são descartadas
+    por LRU, limitando a memória sob ataques com muitos IPs ou contas.
+
+    Args:
+        max_keys (int): Número máximo de buckets mantidos
+        timer (Callable[[], float]): Relógio monotônico. Defaults to
+            time.monotonic.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 100_000,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.max_keys = max_keys
+        self._timer = timer
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def consume(
+        self, key: str, capacity: int, refill_per_second: float
+    ) -> float:
+        now = self._timer()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+@dataclass(frozen=True)
+class Limit:
+    """
+    Limite de um token bucket.
+
+    Attributes:
+        capacity (int): Rajada máxima de requisições
+        period (float): Segundos para reabastecer o bucket inteiro
+    """
+
+    capacity: int
+    period: float
+
+
+class RateLimiter:
+    """
+    Aplica limites nomeados (ex.: por IP e por conta) sobre um backend.
+
+    Args:
+        backend (RateLimitBackend): Armazenamento dos buckets
+        limits (dict[str, Limit]): Limite por escopo. Escopos com
+            capacidade `0` não são limitados
+        prefix (str): Prefixo das chaves no backend
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        limits: dict[str, Limit],
+        prefix: str = 'ratelimit',
+    ):
+        self.backend = backend
+        self.limits = {
+            scope: limit
+            for scope, limit in limits.items()
+            if limit.capacity > 0
+        }
+        self.prefix = prefix
+
+    async def check(self, **identities: str) -> int:
+        """
+        Registra uma tentativa para cada identidade informada.
+
+        Args:
+            **identities (str): Valor por escopo, ex.:
+                `check(ip='10.0.0.1', account='a@b.c')`
+
+        Returns:
+            int: 0 se a tentativa é permitida; caso contrário, segundos
+            (arredondados para cima) até a próxima tentativa
+        """
+        retry_after = 0.0
+        for scope, identity in identities.items():
+            limit = self.limits.get(scope)
+            if limit is None:
+                continue
+            retry_after = max(
+                retry_after,
+                await self.backend.consume(
+                    f'{self.prefix}:{scope}:{identity}',
+                    limit.capacity,
+                    limit.capacity / limit.period,
+                ),
+            )
+        return math.ceil(retry_after)
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class Message(BaseModel):
@@ -19,10 +22,54 @@ class UserSchema(BaseModel):
     password: str
 
 
+class UserUpdate(BaseModel):
+    username: str | None = None
+    email: EmailStr | None = None
+    password: str | None = None
+
+
+class UserBulkSchema(BaseModel):
+    users: list[UserSchema] = Field(min_length=1, max_length=5000)
+
+
+class UserBulkConflict(BaseModel):
+    index: int
+    detail: str
+
+
+class UserBulkResult(BaseModel):
+    created: list[UserPublic]
+    conflicts: list[UserBulkConflict]
+
+
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+class FilterPage(BaseModel):
+    limit: int = Field(default=10, ge=1)
+    offset: int = Field(default=0, ge=0)
+    cursor: str | None = None
+
+
+class UserFilter(FilterPage):
+    username: str | None = Field(default=None, min_length=1)
+    email_domain: str | None = Field(default=None, min_length=1)
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    sort: Literal[
+        'id', '-id', 'username', '-username', 'created_at', '-created_at'
+    ] = 'id'
+    include_total: bool = False
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class RefreshTokenSchema(BaseModel):
+    refresh_token: str
@@ -1,22 +1,27 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from zoneinfo import ZoneInfo
 
-from fastapi import Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from jwt import DecodeError, decode, encode
-from pwdlib import PasswordHash
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from jwt import InvalidTokenError
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_api_async.database import get_session
+from fast_api_async.container import Container, get_container
+from fast_api_async.database import (
+    get_session,
+    read_session_factory,
+)
+from fast_api_async.hashing import get_pwd_context
 from fast_api_async.models import User
+from fast_api_async.tokens import TokenKeys
 
-SECRET_KEY = 'your-secret-key'
-ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+USER_COLUMNS = (User.id, User.token_version)
 
-pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='token')
 
 
@@ -33,7 +38,7 @@ def get_password_hash(password: str) -> str:
     Returns:
         str: Hash da senha usando Argon2
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -50,18 +55,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True se a senha corresponde ao hash, False caso contrário
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
-def create_access_token(data: dict):
+def create_access_token(data: dict, keys: TokenKeys):
     """
     Cria um token JWT de acesso com tempo de expiração.
 
     Gera um token JWT contendo os dados fornecidos mais um
-    timestamp de expiração. O token é assinado com a chave secreta.
+    timestamp de expiração. O token é assinado com as chaves
+    configuradas (`container.token_keys`).
 
     Args:
         data (dict): Dados a serem incluídos no payload do token
+        keys (TokenKeys): Chaves de assinatura
 
     Returns:
         str: Token JWT codificado como string
@@ -72,47 +79,318 @@ def create_access_token(data: dict):
         minutes=ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode.update({'exp': expire})
-    encoded_jwt = encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = keys.encode(to_encode)
     return encoded_jwt
 
 
-def get_current_user(
-    session: Session = Depends(get_session),
+def token_claims(user: User | Row, stateless: bool = True) -> dict:
+    """
+    Monta as claims do token de acesso de um usuário.
+
+    Args:
+        user (User | Row): Usuário autenticado, como entidade ou como
+            linha com `id`, `username`, `email` e `token_version`
+        stateless (bool, optional): Inclui o username, permitindo
+            resolver o `Principal` sem consultar o banco. Defaults to
+            True.
+
+    Returns:
+        dict: Claims a serem passadas para `create_access_token`. O id
+        (`uid`) identifica o usuário e a versão (`ver`) permite revogar
+        o token; o email (`sub`) pode mudar e não serve de identidade
+    """
+    claims = {'sub': user.email, 'uid': user.id, 'ver': user.token_version}
+    if stateless:
+        claims['username'] = user.username
+    return claims
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    Usuário autenticado resolvido por `get_current_user`.
+
+    Traz apenas o necessário para autorizar uma escrita: o id (para
+    comparar com o recurso alterado) e a versão de token (para a
+    revogação). Endpoints que precisam de outros dados do usuário os
+    leem no próprio `UPDATE ... RETURNING` ou em uma consulta dedicada.
+
+    Attributes:
+        id (int): ID do usuário
+        token_version (int): Versão de token atual do usuário
+    """
+
+    id: int
+    token_version: int
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Identidade autenticada construída a partir das claims do token.
+
+    O id identifica o usuário. Username e email refletem o momento da
+    emissão do token e não servem para autorização; endpoints que
+    precisam dos dados atuais do usuário devem lê-los do banco.
+
+    Attributes:
+        id (int): ID do usuário
+        username (str): Username do usuário
+        email (str): Email do usuário
+        token_version (int): Versão de token do usuário na emissão
+    """
+
+    id: int
+    username: str
+    email: str
+    token_version: int
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=HTTPStatus.UNAUTHORIZED,
+        detail='Could not validate credentials',
+        headers={'WWW-Authenticate': 'Bearer'},
+    )
+
+
+def _decode_token(token: str, keys: TokenKeys) -> dict:
+    try:
+        payload = keys.decode(token)
+    except InvalidTokenError:
+        raise _credentials_exception()
+    if not payload.get('sub'):
+        raise _credentials_exception()
+    return payload
+
+
+def invalidate_cached_user(container: Container, user_id: int):
+    """
+    Remove dos caches de autenticação todas as entradas de um usuário.
+
+    Deve ser chamada sempre que a linha do usuário for alterada ou
+    removida, para que tokens já emitidos voltem a consultar o banco.
+
+    Args:
+        container (Container): Recursos da aplicação
+        user_id (int): ID do usuário alterado
+    """
+    container.principal_cache.discard_where(lambda user: user.id == user_id)
+    container.token_versions.pop(user_id)
+
+
+async def get_current_user(
+    session: AsyncSession = Depends(get_session),
     token: str = Depends(oauth2_scheme),
+    container: Container = Depends(get_container),
 ):
     """
     Obtém o usuário atual a partir do token JWT fornecido.
 
-    Valida o token JWT, extrai o email do usuário e busca o usuário
-    correspondente no banco de dados. Usado como dependency em endpoints
-    que requerem autenticação.
+    Valida o token JWT e busca o usuário pelo id assinado (`uid`),
+    conferindo a versão do token. Tokens sem `uid` são resolvidos pelo
+    email (`sub`). Usado como dependency em endpoints que requerem
+    autenticação.
+
+    A consulta lê apenas o id e a versão de token (`USER_COLUMNS`),
+    nunca o hash da senha. Usuários resolvidos ficam em um cache TTL+LRU
+    indexado pelo token (limitado também pela expiração do token),
+    evitando a consulta ao banco em requisições subsequentes com o mesmo
+    token.
 
     Args:
-        session (Session): Sessão do banco de dados injetada via dependency
+        session (AsyncSession): Sessão assíncrona do banco injetada via
+            dependency
         token (str): Token JWT extraído do header Authorization
+        container (Container): Recursos da aplicação injetados via
+            dependency
 
     Raises:
         HTTPException: 401 UNAUTHORIZED se token é inválido
         HTTPException: 401 UNAUTHORIZED se token não contém 'sub'
         HTTPException: 401 UNAUTHORIZED se usuário não existe
+        HTTPException: 401 UNAUTHORIZED se o token foi revogado
 
     Returns:
-        User: Instância do usuário autenticado
+        CurrentUser: Id e versão de token do usuário autenticado
     """
-    credentials_exception = HTTPException(
-        status_code=HTTPStatus.UNAUTHORIZED,
-        detail='Could not validate credentials',
-        headers={'WWW-Authenticate': 'Bearer'},
-    )
-    try:
-        payload = decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        subject_email = payload.get('sub')
-        if not subject_email:
-            raise credentials_exception
-    except DecodeError:
-        raise credentials_exception
-
-    user = session.scalar(select(User).where(User.email == subject_email))
-    if not user:
-        raise credentials_exception
+    principal_cache = container.principal_cache
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    payload = _decode_token(token, container.token_keys)
+    # O id assinado identifica o usuário; o email (`sub`) pode ter sido
+    # alterado e até cadastrado por outra conta depois da emissão
+    if 'uid' in payload:
+        query = select(*USER_COLUMNS).where(User.id == payload['uid'])
+    else:
+        query = select(*USER_COLUMNS).where(User.email == payload['sub'])
+    row = (await session.execute(query)).first()
+    if row is None or payload.get('ver', row.token_version) != (
+        row.token_version
+    ):
+        raise _credentials_exception()
+
+    user = CurrentUser(id=row.id, token_version=row.token_version)
+    principal_cache.set(token, user, ttl=payload['exp'] - time.time())
     return user
+
+
+async def _current_token_version(
+    container: Container, user_id: int
+) -> int | None:
+    version = container.token_versions.get(user_id)
+    if version is None:
+        async with container.readonly_session_factory() as session:
+            version = await session.scalar(
+                select(User.token_version).where(User.id == user_id)
+            )
+        if version is not None:
+            container.token_versions.set(user_id, version)
+    return version
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    container: Container = Depends(get_container),
+) -> Principal:
+    """
+    Obtém a identidade autenticada apenas a partir do token JWT.
+
+    Caminho rápido para endpoints de leitura: o `Principal` é montado
+    com as claims do token verificado, sem carregar o usuário. A
+    revogação é feita pela versão de token do usuário, que fica em cache
+    (TTL) e só é consultada no banco quando ausente; tokens emitidos
+    antes de uma troca de senha ou de uma exclusão deixam de valer.
+
+    Tokens sem o username (emitidos com `AUTH_STATELESS_TOKENS`
+    desabilitado) são resolvidos no banco pelo id, como em
+    `get_current_user`; apenas tokens sem `uid` recorrem ao email.
+
+    Args:
+        token (str): Token JWT extraído do header Authorization
+        container (Container): Recursos da aplicação injetados via
+            dependency
+
+    Raises:
+        HTTPException: 401 UNAUTHORIZED se token é inválido
+        HTTPException: 401 UNAUTHORIZED se usuário não existe
+        HTTPException: 401 UNAUTHORIZED se o token foi revogado
+
+    Returns:
+        Principal: Identidade do usuário autenticado
+    """
+    payload = _decode_token(token, container.token_keys)
+    if not {'uid', 'username', 'ver'} <= payload.keys():
+        query = select(
+            User.id, User.username, User.email, User.token_version
+        )
+        if 'uid' in payload:
+            query = query.where(User.id == payload['uid'])
+        else:
+            query = query.where(User.email == payload['sub'])
+        async with container.readonly_session_factory() as session:
+            row = (await session.execute(query)).first()
+        if row is None or payload.get('ver', row.token_version) != (
+            row.token_version
+        ):
+            raise _credentials_exception()
+        return Principal(
+            id=row.id,
+            username=row.username,
+            email=row.email,
+            token_version=row.token_version,
+        )
+
+    version = await _current_token_version(container, payload['uid'])
+    if version is None or version != payload['ver']:
+        raise _credentials_exception()
+
+    return Principal(
+        id=payload['uid'],
+        username=payload['username'],
+        email=payload['sub'],
+        token_version=payload['ver'],
+    )
+
+
+async def limit_login_attempts(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    container: Container = Depends(get_container),
+):
+    """
+    Limita as tentativas de login por IP e por conta.
+
+    Executada antes da consulta ao banco e do Argon2: tentativas acima
+    do limite são rejeitadas sem custo de CPU, preservando a latência do
+    tráfego legítimo durante ataques de força bruta.
+
+    Args:
+        request (Request): Requisição atual, para o IP do cliente
+        form_data (OAuth2PasswordRequestForm): Dados de login (o mesmo
+            objeto recebido pelo endpoint)
+        container (Container): Recursos da aplicação injetados via
+            dependency
+
+    Raises:
+        HTTPException: 429 TOO_MANY_REQUESTS com `Retry-After` se o IP ou
+            a conta excederam o limite
+    """
+    client_ip = request.client.host if request.client else 'unknown'
+    retry_after = await container.login_limiter.check(
+        ip=client_ip, account=form_data.username.lower()
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many login attempts',
+            headers={'Retry-After': str(retry_after)},
+        )
+
+
+def pin_reads_to_primary(
+    response: Response, container: Container = Depends(get_container)
+):
+    """
+    Leva as próximas leituras do cliente ao primário (read-your-writes).
+
+    Usada como dependência dos endpoints de escrita: o cookie de pin só
+    chega ao cliente quando o endpoint conclui sem erro, isto é, depois
+    do commit.
+
+    Args:
+        response (Response): Resposta, que recebe o cookie de pin
+        container (Container): Recursos da aplicação injetados via
+            dependency
+    """
+    container.replica_router.pin(response)
+
+
+def get_read_session_factory(
+    request: Request,
+    principal: Principal = Depends(get_current_principal),
+    container: Container = Depends(get_container),
+):
+    """
+    Fábrica de sessões somente leitura para endpoints autenticados.
+
+    As sessões são roteadas para as réplicas de leitura, exceto logo após
+    uma escrita do próprio cliente (cookie de pin), quando leem do
+    primário (read-your-writes). A sessão só é aberta, e a conexão só é
+    obtida do pool, quando o endpoint chama a fábrica.
+
+    Args:
+        request (Request): Requisição, com o cookie de pin opcional
+        principal (Principal): Identidade autenticada injetada via
+            dependency
+        container (Container): Recursos da aplicação injetados via
+            dependency
+
+    Returns:
+        Callable: Abre a sessão com `async with factory() as session`
+    """
+    return read_session_factory(
+        container, container.replica_router.pinned(request)
+    )
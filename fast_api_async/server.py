@@ -0,0 +1,244 @@
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from contextlib import suppress
+
+import uvicorn
+
+from fast_api_async.app import app
+from fast_api_async.settings import Settings
+
+STARTUP_FAILURE = 3
+HANDLED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+# Folga do mestre além do timeout de encerramento dos próprios workers
+KILL_GRACE_SECONDS = 5
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def worker_count(settings: Settings) -> int:
+    """
+    Retorna quantos workers o servidor deve iniciar.
+
+    Args:
+        settings (Settings): Configurações da aplicação
+
+    Returns:
+        int: `SERVER_WORKERS`, ou o número de CPUs quando não informado
+    """
+    return settings.SERVER_WORKERS or os.cpu_count() or 1
+
+
+def hashing_workers(settings: Settings, workers: int) -> int:
+    """
+    Divide as CPUs entre os pools de Argon2 dos workers.
+
+    Cada worker tem o próprio pool de processos de hashing; sem um limite
+    explícito, N workers criariam N pools do tamanho da máquina.
+
+    Args:
+        settings (Settings): Configurações da aplicação
+        workers (int): Número de workers do servidor
+
+    Returns:
+        int: `HASHING_MAX_WORKERS`, ou a fatia de CPUs de cada worker
+    """
+    if settings.HASHING_MAX_WORKERS is not None:
+        return settings.HASHING_MAX_WORKERS
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def build_config(
+    settings: Settings,
+    host: str | None = None,
+    port: int | None = None,
+    access_log: bool = False,
+) -> uvicorn.Config:
+    """
+    Cria a configuração do uvicorn usada por cada worker.
+
+    Usa uvloop e httptools, lifespan obrigatório (uma falha na
+    inicialização derruba o servidor em vez de servir sem recursos) e
+    log de acesso desligado por padrão, pois custa uma linha de log por
+    requisição.
+
+    Args:
+        settings (Settings): Configurações da aplicação
+        host (str | None): Sobrescreve `SERVER_HOST`
+        port (int | None): Sobrescreve `SERVER_PORT`
+        access_log (bool): Habilita o log de acesso do uvicorn
+
+    Returns:
+        uvicorn.Config: Configuração pronta para `uvicorn.Server`
+    """
+    return uvicorn.Config(
+        app,
+        host=host or settings.SERVER_HOST,
+        port=port or settings.SERVER_PORT,
+        loop='uvloop',
+        http='httptools',
+        lifespan='on',
+        access_log=access_log,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    )
+
+
+class Supervisor:
+    """
+    Processo mestre que faz pre-fork dos workers do uvicorn.
+
+    A aplicação é importada e o socket é aberto no mestre antes do
+    `fork`, então os workers compartilham por copy-on-write o código e
+    os objetos já carregados (o `gc.freeze` evita que o coletor toque
+    nessas páginas). Os recursos de banco e hashing são criados depois,
+    no lifespan de cada worker.
+
+    Workers que morrem são recriados; uma falha na inicialização encerra
+    o servidor. Em SIGTERM ou SIGINT o mestre repassa SIGTERM aos
+    workers, que param de aceitar conexões e concluem as requisições em
+    andamento; os que não terminam em `graceful_timeout` recebem SIGKILL.
+
+    Args:
+        config (uvicorn.Config): Configuração dos workers
+        workers (int): Número de workers
+        graceful_timeout (float): Segundos aguardando os workers no
+            encerramento
+    """
+
+    def __init__(
+        self, config: uvicorn.Config, workers: int, graceful_timeout: float
+    ):
+        self.config = config
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.exit_code = 0
+        self._children: set[int] = set()
+        self._should_exit = False
+        self._sock: socket.socket | None = None
+
+    def _handle_exit(self, sig, frame):
+        self._should_exit = True
+
+    def _serve(self) -> int:
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, signal.SIG_DFL)
+        server = uvicorn.Server(self.config)
+        server.run(sockets=[self._sock])
+        return 0 if server.started else STARTUP_FAILURE
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._serve()
+            except BaseException:
+                logger.exception('Worker %d crashed', os.getpid())
+            finally:
+                os._exit(code)
+        self._children.add(pid)
+
+    def _reap(self):
+        while self._children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            self._children.discard(pid)
+            if self._should_exit:
+                continue
+
+            code = os.waitstatus_to_exitcode(status)
+            if code == STARTUP_FAILURE:
+                logger.error('Worker %d failed to start, shutting down', pid)
+                self._should_exit = True
+                self.exit_code = STARTUP_FAILURE
+            else:
+                logger.warning('Worker %d exited (%d), restarting', pid, code)
+                self._spawn()
+
+    def _stop(self):
+        for pid in self._children:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+
+        for pid in self._children:
+            logger.warning('Worker %d did not stop in time, killing', pid)
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self._children.clear()
+
+    def run(self) -> int:
+        """
+        Inicia os workers e os supervisiona até o encerramento.
+
+        Returns:
+            int: Código de saída do servidor
+        """
+        self._sock = self.config.bind_socket()
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, self._handle_exit)
+
+        gc.freeze()
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info(
+            'Started %d workers (master pid %d)', self.workers, os.getpid()
+        )
+
+        try:
+            while not self._should_exit:
+                self._reap()
+                time.sleep(0.5)
+        finally:
+            self._stop()
+            self._sock.close()
+        return self.exit_code
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Ponto de entrada do servidor de produção.
+
+    Args:
+        argv (list[str] | None): Argumentos da linha de comando. Defaults
+            to `sys.argv[1:]`.
+
+    Returns:
+        int: Código de saída do servidor
+    """
+    parser = argparse.ArgumentParser(description='Servidor de produção')
+    parser.add_argument('--host', help='Sobrescreve SERVER_HOST')
+    parser.add_argument('--port', type=int, help='Sobrescreve SERVER_PORT')
+    parser.add_argument(
+        '--workers', type=int, help='Sobrescreve SERVER_WORKERS'
+    )
+    parser.add_argument(
+        '--access-log', action='store_true', help='Habilita o log de acesso'
+    )
+    args = parser.parse_args(argv)
+
+    settings = Settings()
+    workers = args.workers or worker_count(settings)
+    # Lido pelo `Settings()` do lifespan de cada worker
+    os.environ['HASHING_MAX_WORKERS'] = str(hashing_workers(settings, workers))
+    config = build_config(settings, args.host, args.port, args.access_log)
+    return Supervisor(
+        config,
+        workers,
+        settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + KILL_GRACE_SECONDS,
+    ).run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
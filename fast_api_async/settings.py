@@ -1,3 +1,6 @@
+from typing import Literal
+
+from pydantic import PositiveFloat
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,8 +14,137 @@ class Settings(BaseSettings):
 
     Attributes:
         DATABASE_URL (str): URL de conexão com o banco de dados
+        DATABASE_POOL_SIZE (int): Conexões mantidas abertas no pool
+        DATABASE_MAX_OVERFLOW (int): Conexões extras além de `POOL_SIZE`
+        DATABASE_POOL_TIMEOUT (float): Segundos aguardando uma conexão livre
+            antes de falhar
+        DATABASE_POOL_PRE_PING (bool): Testa a conexão antes de usá-la
+        DATABASE_POOL_RECYCLE (int): Idade máxima de uma conexão, em
+            segundos. `-1` desabilita
+        DATABASE_STATEMENT_TIMEOUT_MS (int | None): Timeout de statements
+            no servidor (PostgreSQL/asyncpg)
+        DATABASE_ECHO (bool): Loga todo o SQL emitido
+        DATABASE_REPLICA_URLS (list[str]): URLs das réplicas de leitura
+        DATABASE_REPLICA_PIN_SECONDS (float): Janela após uma escrita em
+            que as leituras do mesmo cliente vão para o primário. O pin
+            viaja em um cookie (`replica_pin`), válido em qualquer worker;
+            clientes que não reenviam cookies não têm read-your-writes
+        DATABASE_REPLICA_RETRY_SECONDS (float): Tempo fora de rotação de
+            uma réplica que falhou ao conectar
+        SQLITE_BUSY_TIMEOUT_MS (int): Espera por locks no SQLite
+        SQLITE_MMAP_SIZE (int): Bytes do banco SQLite mapeados em memória
+        HASHING_MAX_WORKERS (int | None): Processos dedicados ao Argon2.
+            `None` usa o número de CPUs; `0` usa o threadpool
+        HASHING_MAX_CONCURRENCY (int | None): Limite de operações de hashing
+            simultâneas. `None` usa o número de workers
+        HASHING_BULK_MAX_CONCURRENCY (int | None): Limite, dentro de
+            `HASHING_MAX_CONCURRENCY`, para os hashes de importações em
+            lote. `None` usa metade do limite geral
+        AUTH_CACHE_TTL_SECONDS (int): Tempo máximo que um usuário
+            autenticado permanece no cache de tokens
+        AUTH_CACHE_MAX_SIZE (int): Número máximo de tokens no cache.
+            `0` desabilita o cache
+        LOGIN_RATE_LIMIT_PER_IP (int): Tentativas de login por IP a cada
+            `LOGIN_RATE_LIMIT_PERIOD_SECONDS`. `0` desabilita
+        LOGIN_RATE_LIMIT_PER_ACCOUNT (int): Tentativas de login por conta
+            a cada `LOGIN_RATE_LIMIT_PERIOD_SECONDS`. `0` desabilita
+        LOGIN_RATE_LIMIT_PERIOD_SECONDS (PositiveFloat): Janela dos
+            limites de login (tempo para reabastecer o bucket). Deve ser
+            maior que zero; para desabilitar, use os limites `0`
+        SECRET_KEY (str | None): Chave de assinatura dos tokens HMAC
+            (`HS256`); obrigatória com esse algoritmo
+        JWT_ALGORITHM (Literal['HS256', 'EdDSA', 'ES256']): Algoritmo de
+            assinatura dos tokens; outros valores são rejeitados
+        JWT_PRIVATE_KEY (str | None): Chave privada PEM (EdDSA/ES256)
+        JWT_PUBLIC_KEY (str | None): Chave pública PEM (EdDSA/ES256)
+        REFRESH_TOKEN_EXPIRE_DAYS (int): Validade dos refresh tokens
+        AUTH_STATELESS_TOKENS (bool): Inclui o username nas claims
+            (id e versão do token estão sempre presentes), dispensando a
+            consulta ao banco na autenticação dos endpoints de leitura
+        MAX_PAGE_SIZE (int): Tamanho máximo de página aceito nas listagens
+        USER_COUNT_TTL_SECONDS (int): Validade do total de usuários em
+            cache nas listagens. `0` conta a cada requisição
+        RESPONSE_CACHE_MAX_ENTRIES (int): Respostas de listagem mantidas
+            em cache. `0` desabilita o armazenamento (ETags continuam)
+        RESPONSE_CACHE_TTL_SECONDS (float): Validade das respostas em
+            cache; limita a defasagem entre workers
+        COMPRESSION_ENCODINGS (list[str]): Codificações oferecidas (`br`,
+            `gzip`), em ordem de preferência. Vazia desabilita a compressão
+        COMPRESSION_MINIMUM_SIZE (int): Tamanho mínimo, em bytes, de uma
+            resposta para ser comprimida
+        COMPRESSION_GZIP_LEVEL (int): Nível do gzip (1 a 9)
+        COMPRESSION_BROTLI_QUALITY (int): Qualidade do brotli (0 a 11)
+        COMPRESSION_CONTENT_TYPES (list[str]): Tipos de conteúdo
+            comprimidos
+        QUERY_PROFILER_ENABLED (bool): Anexa o profiler de consultas SQL
+        SLOW_QUERY_THRESHOLD_MS (float): Duração a partir da qual um
+            statement é logado como lento
+        QUERY_BUDGET_PER_REQUEST (int | None): Consultas por requisição
+            antes de um aviso. `None` desabilita
+        QUERY_REPEAT_THRESHOLD (int | None): Repetições do mesmo statement
+            por requisição antes de um aviso de N+1. `None` desabilita
+        QUERY_PROFILER_EXPLAIN (bool): Loga o plano de execução das
+            consultas lentas
+        SERVER_HOST (str): Endereço em que o servidor de produção escuta
+        SERVER_PORT (int): Porta do servidor de produção
+        SERVER_WORKERS (int | None): Processos do servidor de produção.
+            `None` usa o número de CPUs
+        SERVER_GRACEFUL_TIMEOUT_SECONDS (int): Tempo para concluir as
+            requisições em andamento após um SIGTERM
+        THREADPOOL_SIZE (int | None): Threads do anyio por worker. `None`
+            usa `DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW`
     """
     model_config = SettingsConfigDict(
         env_file='.env', env_file_encoding='utf-8'
     )
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_STATEMENT_TIMEOUT_MS: int | None = None
+    DATABASE_ECHO: bool = False
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_PIN_SECONDS: float = 5
+    DATABASE_REPLICA_RETRY_SECONDS: float = 30
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268_435_456
+    HASHING_MAX_WORKERS: int | None = None
+    HASHING_MAX_CONCURRENCY: int | None = None
+    HASHING_BULK_MAX_CONCURRENCY: int | None = None
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 1024
+    AUTH_STATELESS_TOKENS: bool = True
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    LOGIN_RATE_LIMIT_PER_ACCOUNT: int = 5
+    LOGIN_RATE_LIMIT_PERIOD_SECONDS: PositiveFloat = 60
+    SECRET_KEY: str | None = None
+    JWT_ALGORITHM: Literal['HS256', 'EdDSA', 'ES256'] = 'HS256'
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    MAX_PAGE_SIZE: int = 100
+    USER_COUNT_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+    COMPRESSION_ENCODINGS: list[str] = ['br', 'gzip']
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CONTENT_TYPES: list[str] = [
+        'application/json',
+        'application/x-ndjson',
+        'text/csv',
+        'text/plain',
+    ]
+    QUERY_PROFILER_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+    QUERY_BUDGET_PER_REQUEST: int | None = 20
+    QUERY_REPEAT_THRESHOLD: int | None = 5
+    QUERY_PROFILER_EXPLAIN: bool = False
+    SERVER_HOST: str = '0.0.0.0'
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int | None = None
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    THREADPOOL_SIZE: int | None = None
@@ -0,0 +1,101 @@
+import hashlib
+import secrets
+from dataclasses import dataclass
+from typing import Any
+
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt import decode, encode
+
+from fast_api_async.settings import Settings
+
+ASYMMETRIC_ALGORITHMS = {'EdDSA', 'ES256'}
+
+
+@dataclass(frozen=True)
+class TokenKeys:
+    """
+    Material de chave do JWT, carregado uma única vez.
+
+    Chaves PEM são convertidas em objetos de chave do `cryptography` na
+    criação, para que emitir e validar tokens custe apenas a assinatura
+    (HMAC, Ed25519 ou ECDSA) e não o parsing da chave a cada chamada.
+
+    Attributes:
+        algorithm (str): Algoritmo de assinatura (`HS256`, `EdDSA` ou
+            `ES256`)
+        signing_key (Any): Chave usada em `encode`
+        verifying_key (Any): Chave usada em `decode`
+    """
+
+    algorithm: str
+    signing_key: Any
+    verifying_key: Any
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'TokenKeys':
+        """
+        Cria as chaves a partir das configurações.
+
+        Algoritmos HMAC exigem `SECRET_KEY`; `EdDSA` e `ES256` exigem
+        `JWT_PRIVATE_KEY` e `JWT_PUBLIC_KEY` em PEM.
+
+        Args:
+            settings (Settings): Configurações da aplicação
+
+        Raises:
+            ValueError: Se as chaves do algoritmo não foram configuradas
+
+        Returns:
+            TokenKeys: Chaves prontas para uso
+        """
+        algorithm = settings.JWT_ALGORITHM
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            if not settings.SECRET_KEY:
+                raise ValueError(f'{algorithm} requires SECRET_KEY')
+            secret = settings.SECRET_KEY.encode()
+            return cls(algorithm, secret, secret)
+
+        if not settings.JWT_PRIVATE_KEY or not settings.JWT_PUBLIC_KEY:
+            raise ValueError(
+                f'{algorithm} requires JWT_PRIVATE_KEY and JWT_PUBLIC_KEY'
+            )
+        return cls(
+            algorithm,
+            load_pem_private_key(
+                settings.JWT_PRIVATE_KEY.encode(), password=None
+            ),
+            load_pem_public_key(settings.JWT_PUBLIC_KEY.encode()),
+        )
+
+    def encode(self, payload: dict) -> str:
+        return encode(payload, self.signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return decode(token, self.verifying_key, algorithms=[self.algorithm])
+
+
+def new_refresh_token() -> str:
+    """
+    Gera um refresh token opaco com 256 bits de entropia.
+    """
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Calcula o hash armazenado de um refresh token.
+
+    Por ser aleatório e de alta entropia, o token não precisa de um hash
+    lento como o Argon2: um SHA-256 impede o uso de tokens vazados do
+    banco sem custo perceptível na renovação.
+
+    Args:
+        token (str): Refresh token entregue ao cliente
+
+    Returns:
+        str: SHA-256 do token em hexadecimal
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
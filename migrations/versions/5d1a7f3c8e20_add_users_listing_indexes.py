@@ -0,0 +1,46 @@
+"""add users listing indexes
+
+Revision ID: 5d1a7f3c8e20
+Revises: 8c4f2a9e6b13
+Create Date: 2026-10-18 11:48:19.220614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1a7f3c8e20'
+down_revision: Union[str, Sequence[str], None] = '8c4f2a9e6b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_users_email_lower',
+        'users',
+        [sa.text('lower(email)')],
+        unique=True,
+    )
+    op.create_index(
+        'ix_users_created_at_id', 'users', ['created_at', 'id']
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix_users_username_pattern',
+            'users',
+            ['username'],
+            postgresql_ops={'username': 'text_pattern_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_username_pattern', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_users_email_lower', table_name='users')
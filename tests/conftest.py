@@ -2,63 +2,98 @@ from contextlib import contextmanager
 from datetime import datetime
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_api_async.app import app
-from fast_api_async.database import get_session
+from fast_api_async.container import Container
 from fast_api_async.models import User, table_registry
 from fast_api_async.security import get_password_hash
+from fast_api_async.settings import Settings
 
 
 @pytest.fixture
-def client(session):
+def client(container):
     """
     Fixture que fornece um cliente de teste do FastAPI.
 
-    Cria um TestClient configurado com override da sessão do banco
-    para usar o banco em memória nos testes.
+    Cria um TestClient que usa o container do teste (banco em memória),
+    instalado em `app.state` antes do lifespan da aplicação.
 
     Args:
-        session (Session): Fixture de sessão do banco de dados
+        container (Container): Fixture com os recursos da aplicação
 
     Yields:
         TestClient: Cliente de teste configurado para os testes
     """
-
     # Arrange
-    def get_session_override():
-        return session
+    app.state.container = container
 
     with TestClient(app) as client:
-        app.dependency_overrides[get_session] = get_session_override
         yield client
 
-    app.dependency_overrides.clear()
+    del app.state.container
 
 
 @pytest.fixture
-def session():
+def settings():
     """
-    Fixture que fornece uma sessão de banco de dados em memória.
+    Fixture com as configurações usadas nos testes.
 
-    Cria um banco SQLite em memória para isolamento completo entre
-    testes. As tabelas são criadas e destruídas automaticamente.
+    Usa um banco SQLite em memória e executa o hashing no threadpool,
+    ignorando o arquivo .env local.
 
-    Yields:
-        Session: Sessão do SQLAlchemy para o banco em memória
+    Returns:
+        Settings: Configurações da aplicação para os testes
     """
-    engine = create_engine(
-        'sqlite:///:memory:',
-        connect_args={'check_same_thread': False},
-        poolclass=StaticPool,
+    return Settings(
+        _env_file=None,
+        DATABASE_URL='sqlite+aiosqlite:///:memory:',
+        HASHING_MAX_WORKERS=0,
+        SECRET_KEY='test-secret-key-for-hs256-signatures',
     )
-    table_registry.metadata.create_all(engine)
-    with Session(engine) as session:
+
+
+@pytest_asyncio.fixture
+async def container(settings):
+    """
+    Fixture que fornece o container de recursos da aplicação.
+
+    Cria um engine novo por teste, com as tabelas criadas e destruídas
+    automaticamente, garantindo isolamento completo entre testes.
+
+    Args:
+        settings (Settings): Fixture de configurações
+
+    Yields:
+        Container: Recursos da aplicação para o banco em memória
+    """
+    container = Container.from_settings(settings)
+    async with container.engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    yield container
+
+    async with container.engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+    await container.aclose()
+
+
+@pytest_asyncio.fixture
+async def session(container):
+    """
+    Fixture que fornece uma sessão assíncrona de banco de dados em memória.
+
+    Args:
+        container (Container): Fixture com os recursos da aplicação
+
+    Yields:
+        AsyncSession: Sessão assíncrona do SQLAlchemy para o banco em memória
+    """
+    async with container.session_factory() as session:
         yield session
-    table_registry.metadata.drop_all(engine)
 
 
 @contextmanager
@@ -93,8 +128,8 @@ def mock_db_time():
     return _mock_db_time
 
 
-@pytest.fixture
-def user(session: Session):
+@pytest_asyncio.fixture
+async def user(session: AsyncSession):
     """
     Fixture que cria um usuário de teste no banco.
 
@@ -102,7 +137,7 @@ def user(session: Session):
     a senha em texto plano para facilitar testes de autenticação.
 
     Args:
-        session (Session): Sessão do banco de dados
+        session (AsyncSession): Sessão do banco de dados
 
     Returns:
         User: Instância do usuário criado com atributo clean_password
@@ -114,8 +149,8 @@ def user(session: Session):
         password=get_password_hash(password),
     )
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
 
     user.clean_password = password
 
@@ -1,6 +1,15 @@
+import json
+import sqlite3
 from http import HTTPStatus
 
-from fast_api_async.schemas import UserPublic
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from fast_api_async.app import unique_violation_detail, user_filters
+from fast_api_async.models import User
+from fast_api_async.schemas import UserFilter, UserPublic
 
 # Exercícios
 # TODO: Escrever um teste para o erro de 404 (NOT FOUND) para o endpoint de
@@ -55,6 +64,89 @@ def test_create_user(client):
     }
 
 
+def test_create_user_username_already_exists(client, user):
+    """
+    Testa o erro 400 (BAD REQUEST) ao criar usuário com username existente.
+    """
+    response = client.post(
+        '/users/',
+        json={
+            'username': user.username,
+            'email': 'other@example.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Username already exists'}
+
+
+def test_create_user_email_already_exists(client, user):
+    """
+    Testa o erro 400 (BAD REQUEST) ao criar usuário com email existente.
+    """
+    response = client.post(
+        '/users/',
+        json={
+            'username': 'other',
+            'email': user.email,
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Email already exists'}
+
+
+def test_create_users_bulk(client, user, token):
+    """
+    Testa a criação de usuários em lote via endpoint POST /users/bulk.
+
+    Verifica se os usuários válidos são criados e se os conflitos com a
+    base e dentro do próprio lote são reportados por índice.
+    """
+    response = client.post(
+        '/users/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'users': [
+                {
+                    'username': 'alice',
+                    'email': 'alice@example.com',
+                    'password': 'secret',
+                },
+                {
+                    'username': user.username,
+                    'email': 'other@example.com',
+                    'password': 'secret',
+                },
+                {
+                    'username': 'bob',
+                    'email': 'alice@example.com',
+                    'password': 'secret',
+                },
+                {
+                    'username': 'carol',
+                    'email': 'carol@example.com',
+                    'password': 'secret',
+                },
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {
+        'created': [
+            {'id': 2, 'username': 'alice', 'email': 'alice@example.com'},
+            {'id': 3, 'username': 'carol', 'email': 'carol@example.com'},
+        ],
+        'conflicts': [
+            {'index': 1, 'detail': 'Username already exists'},
+            {'index': 2, 'detail': 'Email already exists'},
+        ],
+    }
+
+
 def test_read_users(client, user, token):
     """
     Testa a listagem de usuários via endpoint GET /users/.
@@ -68,7 +160,383 @@ def test_read_users(client, user, token):
     )
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {
+        'users': [user_schema],
+        'next_cursor': None,
+        'total': None,
+    }
+
+
+def test_read_users_with_cursor(client, user, token):
+    """
+    Testa a paginação por cursor (keyset) do endpoint GET /users/.
+
+    Percorre as páginas seguindo `next_cursor` e verifica se todos os
+    usuários são retornados uma única vez, em ordem de id.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    for i in range(4):
+        client.post(
+            '/users/',
+            json={
+                'username': f'user{i}',
+                'email': f'user{i}@example.com',
+                'password': 'secret',
+            },
+        )
+
+    ids = []
+    params = {'limit': 2}
+    while True:
+        response = client.get('/users/', headers=headers, params=params)
+        assert response.status_code == HTTPStatus.OK
+        body = response.json()
+        ids.extend(user['id'] for user in body['users'])
+        if body['next_cursor'] is None:
+            break
+        params = {'limit': 2, 'cursor': body['next_cursor']}
+
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_read_users_invalid_cursor(client, token):
+    """
+    Testa o erro 400 (BAD REQUEST) para cursores malformados.
+    """
+    response = client.get(
+        '/users/',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'cursor': 'not-a-cursor'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_read_users_filters(client, user, token):
+    """
+    Testa os filtros por prefixo de username, domínio de email e data de
+    cadastro do endpoint GET /users/.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    for username, email in [
+        ('alice', 'alice@corp.com'),
+        ('alfred', 'alfred@Corp.com'),
+        ('bob', 'bob@home.org'),
+    ]:
+        client.post(
+            '/users/',
+            json={'username': username, 'email': email, 'password': 'x'},
+        )
+
+    def usernames(**params):
+        response = client.get('/users/', headers=headers, params=params)
+        return [user['username'] for user in response.json()['users']]
+
+    assert usernames(username='al') == ['alice', 'alfred']
+    assert usernames(email_domain='corp.com') == ['alice', 'alfred']
+    assert usernames(username='al', sort='-username') == ['alice', 'alfred']
+    assert usernames(created_after='2100-01-01T00:00:00') == []
+    assert len(usernames(created_before='2100-01-01T00:00:00Z')) == 4  # noqa: PLR2004
+
+
+def test_read_users_username_prefix_is_case_sensitive(client, user, token):
+    """
+    Testa se o filtro por prefixo de username diferencia maiúsculas.
+
+    No SQLite o LIKE ignoraria maiúsculas; o filtro deve se comportar
+    como no PostgreSQL.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    for username in ('alice', 'Alfa', 'ALBERTO'):
+        client.post(
+            '/users/',
+            json={
+                'username': username,
+                'email': f'{username.lower()}@x.com',
+                'password': 'x',
+            },
+        )
+
+    def usernames(prefix):
+        response = client.get(
+            '/users/', headers=headers, params={'username': prefix}
+        )
+        return [user['username'] for user in response.json()['users']]
+
+    assert usernames('al') == ['alice']
+    assert usernames('Al') == ['Alfa']
+    assert usernames('AL') == ['ALBERTO']
+
+
+@pytest.mark.parametrize('dialect', [postgresql.dialect(), sqlite.dialect()])
+def test_username_prefix_filter_sql(dialect):
+    """
+    Testa o SQL do filtro por prefixo no PostgreSQL e no SQLite.
+
+    Os dois bancos recebem o mesmo par de condições: o LIKE com o
+    prefixo escapado, que o índice `text_pattern_ops` atende no
+    PostgreSQL, e a comparação exata do início do username, que torna o
+    filtro sensível a maiúsculas também no SQLite.
+    """
+    query = select(User.id).where(*user_filters(UserFilter(username='Al_')))
+
+    sql = str(
+        query.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+    )
+
+    assert "users.username LIKE 'Al/_' ||" in sql
+    assert "substr(users.username, 1, 3) = 'Al_'" in sql
+
+
+class _Diagnostic:
+    def __init__(self, constraint_name):
+        self.constraint_name = constraint_name
+
+
+class _PostgresError(Exception):
+    def __init__(self, constraint_name, message):
+        super().__init__(message)
+        self.diag = _Diagnostic(constraint_name)
+
+
+class _AsyncpgError(Exception):
+    def __init__(self, constraint_name, message):
+        super().__init__(message)
+        self.constraint_name = constraint_name
+
+
+def _asyncpg_adapted(constraint_name, message):
+    # O SQLAlchemy encapsula o erro do asyncpg e o guarda em `__cause__`
+    adapted = Exception(message)
+    adapted.__cause__ = _AsyncpgError(constraint_name, message)
+    return adapted
+
+
+@pytest.mark.parametrize(
+    ('orig', 'detail'),
+    [
+        (
+            _PostgresError(
+                'users_email_key',
+                'Key (email)=(username@test.com) already exists.',
+            ),
+            'Email already exists',
+        ),
+        (
+            _asyncpg_adapted(
+                'users_username_key', 'Key (username)=(email) already exists.'
+            ),
+            'Username already exists',
+        ),
+        (
+            _asyncpg_adapted(
+                'ix_users_email_lower',
+                'Key (lower(email))=(username@test.com) already exists.',
+            ),
+            'Email already exists',
+        ),
+        (
+            sqlite3.IntegrityError('UNIQUE constraint failed: users.email'),
+            'Email already exists',
+        ),
+        (
+            sqlite3.IntegrityError(
+                "UNIQUE constraint failed: index 'ix_users_email_lower'"
+            ),
+            'Email already exists',
+        ),
+        (
+            sqlite3.IntegrityError('NOT NULL constraint failed: users.email'),
+            'Email or username already exists',
+        ),
+    ],
+)
+def test_unique_violation_detail_matches_constraint_name(orig, detail):
+    """
+    Testa se a mensagem de conflito vem da constraint violada.
+
+    Os valores no texto do erro (um email contendo "username", por
+    exemplo) não influenciam a mensagem.
+    """
+    exc = IntegrityError('INSERT INTO users ...', {}, orig)
+
+    assert unique_violation_detail(exc) == detail
+
+
+def test_read_users_sorted_cursor(client, user, token):
+    """
+    Testa a paginação por cursor com ordenação decrescente por data de
+    cadastro. Usuários criados no mesmo segundo empatam em `created_at`
+    e são desempatados por id.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    for i in range(4):
+        client.post(
+            '/users/',
+            json={
+                'username': f'user{i}',
+                'email': f'user{i}@example.com',
+                'password': 'secret',
+            },
+        )
+
+    ids = []
+    params = {'limit': 2, 'sort': '-created_at'}
+    while True:
+        body = client.get('/users/', headers=headers, params=params).json()
+        ids.extend(user['id'] for user in body['users'])
+        if body['next_cursor'] is None:
+            break
+        params = {**params, 'cursor': body['next_cursor']}
+
+    assert ids == [5, 4, 3, 2, 1]
+
+    response = client.get(
+        '/users/',
+        headers=headers,
+        params={'sort': 'username', 'cursor': params['cursor']},
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_read_users_total_uses_cached_count(client, session, user, token):
+    """
+    Testa o total de usuários da listagem, servido da contagem em cache.
+
+    A contagem é carregada uma vez e ajustada por cadastros e exclusões,
+    sem novas consultas de `COUNT(*)`.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'include_total': True}
+    assert (
+        client.get('/users/', headers=headers, params=params).json()['total']
+        == 1
+    )
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    try:
+        client.post(
+            '/users/',
+            json={'username': 'new', 'email': 'new@x.com', 'password': 'x'},
+        )
+        body = client.get('/users/', headers=headers, params=params).json()
+        filtered = client.get(
+            '/users/', headers=headers, params={**params, 'username': 'n'}
+        ).json()
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+    assert body['total'] == 2  # noqa: PLR2004
+    assert filtered['total'] is None
+    assert not any('count(' in s.lower() for s in statements)
+
+
+def test_read_users_conditional_get(client, session, user, token):
+    """
+    Testa o cache de respostas com ETag do endpoint GET /users/.
+
+    Um `If-None-Match` com o ETag atual recebe 304 sem consultar a
+    listagem nem obter uma conexão do pool; após um cadastro, o mesmo
+    ETag deixa de valer e a nova lista é retornada.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/users/', headers=headers).headers['ETag']
+
+    statements = []
+    checkouts = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    def count_checkout(dbapi_connection, record, proxy):
+        checkouts.append(record)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    event.listen(engine.pool, 'checkout', count_checkout)
+    try:
+        response = client.get(
+            '/users/', headers={**headers, 'If-None-Match': etag}
+        )
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+        event.remove(engine.pool, 'checkout', count_checkout)
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not response.content
+    assert statements == []
+    assert checkouts == []
+
+    client.post(
+        '/users/',
+        json={'username': 'new', 'email': 'new@x.com', 'password': 'x'},
+    )
+    response = client.get(
+        '/users/', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+    assert len(response.json()['users']) == 2  # noqa: PLR2004
+
+
+def test_read_users_limit_is_capped(client, settings, user, token):
+    """
+    Testa se o tamanho da página é limitado por `MAX_PAGE_SIZE`.
+    """
+    settings.MAX_PAGE_SIZE = 1
+
+    response = client.get(
+        '/users/',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'limit': 50},
+    )
+
+    assert len(response.json()['users']) == 1
+    assert response.json()['next_cursor'] is not None
+
+
+def test_export_users_ndjson(client, user, token):
+    """
+    Testa a exportação de usuários em NDJSON via GET /users/export.
+
+    Verifica se cada linha da resposta é um usuário no formato público.
+    """
+    user_schema = UserPublic.model_validate(user).model_dump()
+    response = client.get(
+        '/users/export', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == [user_schema]
+
+
+def test_export_users_csv(client, user, token):
+    """
+    Testa a exportação de usuários em CSV via GET /users/export.
+    """
+    response = client.get(
+        '/users/export',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'format': 'csv'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert response.text.splitlines() == [
+        'username,email,id',
+        f'{user.username},{user.email},{user.id}',
+    ]
 
 
 # def test_get_user(client):
@@ -105,6 +573,63 @@ def test_update_user(client, user, token):
     }
 
 
+def test_patch_user(client, user, token):
+    """
+    Testa a atualização parcial de um usuário via PATCH /users/{id}.
+
+    Verifica se apenas o campo enviado é alterado e se a senha atual
+    continua válida para login.
+    """
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'alice_updated'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'username': 'alice_updated',
+        'email': user.email,
+        'id': user.id,
+    }
+
+    response = client.post(
+        '/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_patch_user_password(client, user, token):
+    """
+    Testa a troca de senha via PATCH /users/{id}.
+    """
+    client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'password': 'new_secret'},
+    )
+
+    response = client.post(
+        '/token', data={'username': user.email, 'password': 'new_secret'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_patch_user_forbidden(client, user, token):
+    """
+    Testa o erro 403 (FORBIDDEN) ao atualizar parcialmente outro usuário.
+    """
+    response = client.patch(
+        f'/users/{user.id + 1}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'bob'},
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert response.json() == {'detail': 'Not enough permissions'}
+
+
 def test_delete_user(client, user, token):
     """
     Testa a exclusão de um usuário via endpoint DELETE /users/{id}.
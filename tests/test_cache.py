@@ -0,0 +1,78 @@
+from fast_api_async.cache import CachedCount, TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    """
+    Testa a expiração das entradas do cache após o TTL.
+
+    Verifica se a entrada é retornada antes do TTL, se um TTL menor por
+    entrada é respeitado e se ambas somem após expirar.
+    """
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=60, timer=timer)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=5)
+
+    timer.now = 10
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+
+    timer.now = 61
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """
+    Testa o despejo LRU quando o cache atinge o tamanho máximo.
+
+    Verifica se a entrada acessada mais recentemente é mantida e a
+    menos usada é descartada.
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3  # noqa: PLR2004
+
+
+def test_ttl_cache_discard_where():
+    """
+    Testa a remoção seletiva de entradas por predicado.
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    assert cache.discard_where(lambda value: value == 1) == 1
+    assert cache.get('a') is None
+    assert cache.get('b') == 2  # noqa: PLR2004
+
+
+def test_cached_count_expires_and_adjusts():
+    """
+    Testa o ajuste da contagem em cache e sua expiração após o TTL.
+    """
+    timer = FakeTimer()
+    count = CachedCount(ttl=60, timer=timer)
+    count.adjust(1)
+    assert count.get() is None
+
+    count.set(10)
+    count.adjust(2)
+    assert count.get() == 12  # noqa: PLR2004
+
+    timer.now = 61
+    assert count.get() is None
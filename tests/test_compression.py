@@ -0,0 +1,123 @@
+import gzip
+import json
+import zlib
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+
+from fast_api_async.compression import CompressionMiddleware, CompressionPolicy
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [
+        ('gzip, deflate, br', 'br'),
+        ('gzip', 'gzip'),
+        ('br;q=0.5, gzip', 'gzip'),
+        ('br;q=0, *', 'gzip'),
+        ('identity', None),
+        ('', None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    """
+    Testa a escolha da codificação pelos pesos do `Accept-Encoding`,
+    com desempate pela preferência do servidor.
+    """
+    assert CompressionPolicy().negotiate(accept_encoding) == expected
+
+
+def test_small_responses_are_not_compressed(client):
+    """
+    Testa se respostas abaixo do tamanho mínimo seguem sem compressão,
+    mas indicam que variam por `Accept-Encoding`.
+    """
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+
+
+@pytest.mark.parametrize('encoding', ['br', 'gzip'])
+def test_read_users_is_compressed(client, container, user, token, encoding):
+    """
+    Testa a compressão da listagem de usuários com brotli e gzip.
+    """
+    container.compression = CompressionPolicy(minimum_size=0)
+
+    response = client.get(
+        '/users/',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept-Encoding': encoding,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-encoding'] == encoding
+    assert response.json()['users'][0]['email'] == user.email
+
+
+def test_export_users_is_compressed_in_stream(client, container, user, token):
+    """
+    Testa a compressão da exportação em streaming, sem Content-Length.
+    """
+    container.compression = CompressionPolicy(minimum_size=0)
+
+    response = client.get(
+        '/users/export',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept-Encoding': 'gzip',
+        },
+    )
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    assert json.loads(response.text.splitlines()[0])['email'] == user.email
+
+
+@pytest.mark.asyncio
+async def test_streaming_chunks_are_flushed():
+    """
+    Testa se cada bloco de uma resposta em streaming é enviado já
+    descomprimível, sem esperar o fim do corpo.
+    """
+    chunks = [b'a' * 2000, b'b' * 2000]
+
+    async def stream(scope, receive, send):
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'application/x-ndjson')],
+        })
+        for index, chunk in enumerate(chunks):
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': index < len(chunks) - 1,
+            })
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'headers': [(b'accept-encoding', b'gzip')],
+        'app': SimpleNamespace(
+            state=SimpleNamespace(
+                container=SimpleNamespace(compression=CompressionPolicy())
+            )
+        ),
+    }
+    await CompressionMiddleware(stream)(scope, None, send)
+
+    start, first, last = sent
+    assert (b'content-encoding', b'gzip') in start['headers']
+    decompressor = zlib.decompressobj(31)
+    assert decompressor.decompress(first['body']) == chunks[0]
+    assert gzip.decompress(first['body'] + last['body']) == b''.join(chunks)
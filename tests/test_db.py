@@ -1,11 +1,24 @@
+import os
+import subprocess
+import sys
 from dataclasses import asdict
+from pathlib import Path
 
-from sqlalchemy import select
+import pytest
+from sqlalchemy import func, select, text
 
+from fast_api_async.database import (
+    create_engine_from_settings,
+    instrument_pool,
+)
 from fast_api_async.models import User
+from fast_api_async.settings import Settings
 
+ROOT = Path(__file__).parents[1]
 
-def test_create_user(session, mock_db_time):
+
+@pytest.mark.asyncio
+async def test_create_user(session, mock_db_time):
     """
     Testa a criação de usuário no banco de dados com timestamp mockado.
 
@@ -16,14 +29,101 @@ def test_create_user(session, mock_db_time):
         new_user = User(username='test', email='test@test', password='secret')
 
         session.add(new_user)
-        session.commit()
+        await session.commit()
 
-        user = session.scalar(select(User).where(User.username == 'test'))
+        user = await session.scalar(
+            select(User).where(User.username == 'test')
+        )
 
     assert asdict(user) == {
         'id': 1,
         'username': 'test',
         'email': 'test@test',
         'password': 'secret',
+        'token_version': 0,
         'created_at': time,
     }
+
+
+@pytest.mark.asyncio
+async def test_sqlite_engine_tuning(tmp_path):
+    """
+    Testa os ajustes aplicados às conexões SQLite e as métricas do pool.
+
+    Verifica se WAL, `synchronous=NORMAL` e o busy timeout são aplicados
+    ao conectar e se checkouts e checkins são contabilizados.
+    """
+    settings = Settings(
+        DATABASE_URL=f'sqlite+aiosqlite:///{tmp_path / "tuning.db"}',
+        SQLITE_BUSY_TIMEOUT_MS=1234,
+    )
+    engine = create_engine_from_settings(settings)
+    metrics = instrument_pool(engine)
+
+    async with engine.connect() as conn:
+        journal_mode = await conn.scalar(text('PRAGMA journal_mode'))
+        synchronous = await conn.scalar(text('PRAGMA synchronous'))
+        busy_timeout = await conn.scalar(text('PRAGMA busy_timeout'))
+    await engine.dispose()
+
+    assert journal_mode == 'wal'
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == 1234  # noqa: PLR2004
+    assert metrics.snapshot()['checkouts'] == 1
+    assert metrics.snapshot()['checkins'] == 1
+
+
+@pytest.mark.asyncio
+async def test_login_lookup_uses_lower_email_index(session):
+    """
+    Testa se a busca por email sem diferenciar maiúsculas usa o índice
+    `ix_users_email_lower` em vez de percorrer a tabela.
+    """
+    query = select(User).where(func.lower(User.email) == 'a@b.c')
+    compiled = query.compile(
+        session.bind, compile_kwargs={'literal_binds': True}
+    )
+
+    plan = await session.execute(text(f'EXPLAIN QUERY PLAN {compiled}'))
+
+    assert 'ix_users_email_lower' in ' '.join(row.detail for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_readonly_session_does_not_autoflush(container):
+    """
+    Testa se a sessão somente leitura não envia alterações pendentes ao
+    banco antes das consultas (autoflush desabilitado).
+    """
+    async with container.readonly_session_factory() as session:
+        session.add(User(username='ghost', email='g@x.com', password='x'))
+        found = await session.scalar(
+            select(User).where(User.username == 'ghost')
+        )
+
+    assert found is None
+
+
+def test_migrations_match_models(tmp_path):
+    """
+    Testa se as migrações criam o schema descrito pelos modelos.
+
+    Após `alembic upgrade head` em um SQLite, o `alembic check` não deve
+    encontrar diferenças; índices exclusivos do PostgreSQL (`ddl_if`)
+    ficam de fora da comparação.
+    """
+    env = {
+        **os.environ,
+        'DATABASE_URL': f'sqlite+aiosqlite:///{tmp_path / "migrations.db"}',
+    }
+
+    for command in (['upgrade', 'head'], ['check']):
+        result = subprocess.run(
+            [sys.executable, '-m', 'alembic', *command],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        assert result.returncode == 0, result.stderr
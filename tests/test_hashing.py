@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from fast_api_async.hashing import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_process_pool():
+    """
+    Testa o hashing e a verificação executados no pool de processos.
+
+    Verifica se o hash gerado em um processo separado é válido para a
+    senha original e inválido para outra senha.
+    """
+    hasher = PasswordHasher(max_workers=1)
+    try:
+        hashed = await hasher.hash('secret')
+
+        assert hashed.startswith('$argon2')
+        assert await hasher.verify('secret', hashed)
+        assert not await hasher.verify('wrong', hashed)
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hasher_limits_concurrency():
+    """
+    Testa se o serviço respeita o limite de operações simultâneas.
+
+    Dispara várias operações ao mesmo tempo e verifica que as excedentes
+    aguardam na fila, contabilizadas em `stats()`.
+    """
+    hasher = PasswordHasher(max_workers=0, max_concurrency=1)
+    tasks = [asyncio.create_task(hasher.hash('secret')) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    stats = hasher.stats()
+    assert stats.in_flight == 1
+    assert stats.waiting == 2  # noqa: PLR2004
+
+    await asyncio.gather(*tasks)
+
+    stats = hasher.stats()
+    assert stats.in_flight == 0
+    assert stats.waiting == 0
+    assert stats.completed == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_hash_many_leaves_room_for_logins():
+    """
+    Testa se um lote de hashes não ocupa todas as vagas do pool.
+
+    O lote fica limitado a `bulk_concurrency` operações simultâneas, e um
+    hash individual disparado durante a importação entra no pool sem
+    aguardar o lote.
+    """
+    hasher = PasswordHasher(max_workers=0, max_concurrency=4)
+    batch = asyncio.create_task(hasher.hash_many(['secret'] * 6))
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert hasher.bulk_concurrency == 2  # noqa: PLR2004
+    assert hasher.stats().in_flight == 2  # noqa: PLR2004
+
+    login = asyncio.create_task(hasher.hash('secret'))
+    await asyncio.sleep(0)
+
+    stats = hasher.stats()
+    assert stats.in_flight == 3  # noqa: PLR2004
+    assert stats.waiting == 0
+
+    hashes = await batch
+    await login
+    assert len(hashes) == 6  # noqa: PLR2004
+    assert hasher.stats().completed == 7  # noqa: PLR2004
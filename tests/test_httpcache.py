@@ -0,0 +1,59 @@
+import pytest
+from starlette.requests import Request
+
+from fast_api_async.httpcache import MemoryResponseBackend, ResponseCache
+
+
+def _request(query: str = '', if_none_match: str | None = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b'if-none-match', if_none_match.encode()))
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/users/',
+        'query_string': query.encode(),
+        'headers': headers,
+    })
+
+
+@pytest.mark.asyncio
+async def test_response_cache_key_follows_table_version():
+    """
+    Testa a chave do cache: parâmetros em qualquer ordem geram a mesma
+    chave, e uma escrita na tabela gera uma chave nova.
+    """
+    cache = ResponseCache(MemoryResponseBackend())
+    key = await cache.key('users', _request('limit=5&offset=0'))
+    await cache.store(key, b'[]')
+
+    assert await cache.key('users', _request('offset=0&limit=5')) == key
+    assert await cache.get(key) is not None
+
+    await cache.invalidate('users')
+
+    new_key = await cache.key('users', _request('limit=5&offset=0'))
+    assert new_key != key
+    assert await cache.get(new_key) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('if_none_match', 'status'),
+    [(None, 200), ('{etag}', 304), ('"other", {etag}', 304), ('*', 304)],
+)
+async def test_response_cache_respond_if_none_match(if_none_match, status):
+    """
+    Testa a resposta condicional para diferentes valores de
+    `If-None-Match`, incluindo listas de ETags e `*`.
+    """
+    cache = ResponseCache(MemoryResponseBackend())
+    cached = await cache.store('users:1:/users/?', b'[]')
+    if if_none_match is not None:
+        if_none_match = if_none_match.format(etag=cached.etag)
+
+    response = cache.respond(cached, _request(if_none_match=if_none_match))
+
+    assert response.status_code == status
+    assert response.headers['ETag'] == cached.etag
+    assert response.headers['Cache-Control'] == 'private, no-cache'
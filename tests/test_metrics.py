@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+
+def test_metrics_exposes_request_metrics(client, token):
+    """
+    Testa a exposição das métricas no formato Prometheus via GET /metrics.
+
+    Verifica se a latência é registrada pelo template da rota e se o
+    tempo de banco, de hashing e o estado do pool são exportados.
+    """
+    client.get('/users/', headers={'Authorization': f'Bearer {token}'})
+
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/users/",status="200"}'
+    ) in body
+    assert 'http_request_db_queries_count{method="GET",route="/users/"}' in (
+        body
+    )
+    assert 'password_hashing_seconds_count{operation="verify"}' in body
+    assert 'db_pool{metric="checkouts"}' in body
+    assert 'password_hashing_waiting' in body
+    assert 'threadpool_tokens_total' in body
+
+
+def test_metrics_groups_paths_by_route_template(client, user, token):
+    """
+    Testa se caminhos com parâmetros são agrupados pelo template da rota.
+    """
+    client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'renamed'},
+    )
+
+    body = client.get('/metrics').text
+
+    assert 'route="/users/{user_id}"' in body
+    assert f'route="/users/{user.id}"' not in body
+
+
+def test_metrics_threadpool_matches_database_pool(client):
+    """
+    Testa se o threadpool do anyio é ajustado ao pool de conexões.
+
+    Com as configurações padrão, são `DATABASE_POOL_SIZE` (5) mais
+    `DATABASE_MAX_OVERFLOW` (10) threads.
+    """
+    response = client.get('/metrics')
+
+    assert 'threadpool_tokens_total 15.0' in response.text
@@ -0,0 +1,67 @@
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from fast_api_async.metrics import (
+    RequestStats,
+    _request_stats,  # noqa: PLC2701
+)
+from fast_api_async.models import User
+from fast_api_async.profiling import QueryProfiler, redact_parameters
+
+
+@pytest.fixture
+def request_stats():
+    stats = RequestStats(method='GET', path='/users/')
+    token = _request_stats.set(stats)
+    yield stats
+    _request_stats.reset(token)
+
+
+def test_redact_parameters_hides_values():
+    """
+    Testa se os valores dos parâmetros nunca aparecem no log.
+    """
+    assert redact_parameters(('secret', 42)) == '(?, ?)'
+    assert redact_parameters({'email': 'a@b.c'}) == '{email: ?}'
+    assert redact_parameters([('a',), ('b',)]) == '[2 parameter sets]'
+
+
+@pytest.mark.asyncio
+async def test_profiler_logs_slow_query_with_plan(container, session, caplog):
+    """
+    Testa o log de consultas lentas com parâmetros mascarados e o plano
+    de execução (EXPLAIN QUERY PLAN) da consulta.
+    """
+    QueryProfiler(slow_query_ms=0, explain=True).attach(container.engine)
+
+    with caplog.at_level(logging.WARNING, 'fast_api_async.profiling'):
+        await session.scalar(select(User).where(User.email == 'x@y.z'))
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(m.startswith('Slow query') for m in messages)
+    assert any(m.startswith('Query plan') for m in messages)
+    assert not any('x@y.z' in m for m in messages)
+
+
+@pytest.mark.asyncio
+async def test_profiler_warns_on_budget_and_repeats(
+    container, session, request_stats, caplog
+):
+    """
+    Testa os avisos de orçamento de consultas e de statement repetido
+    (N+1) dentro de uma requisição.
+    """
+    QueryProfiler(
+        slow_query_ms=float('inf'), query_budget=3, repeat_threshold=2
+    ).attach(container.engine)
+
+    with caplog.at_level(logging.WARNING, 'fast_api_async.profiling'):
+        for user_id in range(4):
+            await session.scalar(select(User).where(User.id == user_id))
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert request_stats.statements.total() == 4  # noqa: PLR2004
+    assert any('exceeded the query budget of 3' in m for m in messages)
+    assert sum('Possible N+1 in GET /users/' in m for m in messages) == 1
@@ -0,0 +1,74 @@
+import pytest
+from pydantic import ValidationError
+
+from fast_api_async.ratelimit import Limit, MemoryBackend, RateLimiter
+from fast_api_async.settings import Settings
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refills_over_time():
+    """
+    Testa se o bucket permite a rajada configurada, rejeita o excedente
+    informando o tempo de espera e é reabastecido com o passar do tempo.
+    """
+    timer = FakeTimer()
+    limiter = RateLimiter(
+        MemoryBackend(timer=timer), {'ip': Limit(capacity=2, period=10)}
+    )
+
+    assert await limiter.check(ip='1.1.1.1') == 0
+    assert await limiter.check(ip='1.1.1.1') == 0
+    assert await limiter.check(ip='1.1.1.1') == 5  # noqa: PLR2004
+    assert await limiter.check(ip='2.2.2.2') == 0
+
+    timer.now = 5
+    assert await limiter.check(ip='1.1.1.1') == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_ignores_disabled_scopes():
+    """
+    Testa se escopos com capacidade 0 não são limitados.
+    """
+    limiter = RateLimiter(
+        MemoryBackend(),
+        {'ip': Limit(capacity=0, period=10), 'account': Limit(1, 10)},
+    )
+
+    assert await limiter.check(ip='1.1.1.1', account='a') == 0
+    assert await limiter.check(ip='1.1.1.1', account='b') == 0
+    assert await limiter.check(ip='1.1.1.1', account='a') > 0
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used_keys():
+    """
+    Testa se o backend em memória mantém no máximo `max_keys` buckets.
+    """
+    backend = MemoryBackend(max_keys=2)
+    for key in ('a', 'b', 'c'):
+        await backend.consume(key, capacity=1, refill_per_second=0.1)
+
+    assert await backend.consume('a', capacity=1, refill_per_second=0.1) == 0
+
+
+@pytest.mark.parametrize('period', [0, -1])
+def test_rate_limit_period_must_be_positive(period):
+    """
+    Testa se um período não positivo é rejeitado nas configurações, em
+    vez de dividir por zero no primeiro login.
+    """
+    with pytest.raises(ValidationError, match='LOGIN_RATE_LIMIT_PERIOD'):
+        Settings(
+            _env_file=None,
+            DATABASE_URL='sqlite+aiosqlite:///:memory:',
+            LOGIN_RATE_LIMIT_PERIOD_SECONDS=period,
+        )
@@ -0,0 +1,260 @@
+from http import HTTPStatus
+
+import pytest
+import pytest_asyncio
+from fastapi import Request, Response
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fast_api_async.app import app
+from fast_api_async.container import Container
+from fast_api_async.database import PIN_COOKIE, ReplicaRouter, read_session
+from fast_api_async.models import User, table_registry
+from fast_api_async.security import get_password_hash
+from fast_api_async.settings import Settings
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _create_database(url: str, *users: User):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+    async with engine.begin() as conn:
+        for user in users:
+            await conn.execute(
+                User.__table__.insert().values(
+                    username=user.username,
+                    email=user.email,
+                    password=user.password,
+                )
+            )
+    await engine.dispose()
+
+
+def _user(username: str, password: str = 'secret') -> User:
+    return User(
+        username=username,
+        email=f'{username}@test.com',
+        password=password,
+    )
+
+
+@pytest_asyncio.fixture
+async def replicated_client(tmp_path):
+    """
+    Fixture com um primário e uma réplica em arquivos SQLite distintos.
+
+    A réplica recebe um usuário a mais que o primário, de forma que a
+    origem de cada leitura fica visível na resposta.
+
+    Yields:
+        TestClient: Cliente de teste com o container replicado
+    """
+    password = get_password_hash('testtest')
+    primary_url = f'sqlite+aiosqlite:///{tmp_path / "primary.db"}'
+    replica_url = f'sqlite+aiosqlite:///{tmp_path / "replica.db"}'
+    await _create_database(primary_url, _user('testando', password))
+    await _create_database(
+        replica_url, _user('testando', password), _user('replicado')
+    )
+
+    container = Container.from_settings(
+        Settings(
+            _env_file=None,
+            DATABASE_URL=primary_url,
+            DATABASE_REPLICA_URLS=[replica_url],
+            HASHING_MAX_WORKERS=0,
+            SECRET_KEY='test-secret-key-for-hs256-signatures',
+        )
+    )
+    app.state.container = container
+
+    with TestClient(app) as client:
+        yield client
+
+    del app.state.container
+    await container.aclose()
+
+
+def _login(client: TestClient) -> dict:
+    response = client.post(
+        '/token',
+        data={'username': 'testando@test.com', 'password': 'testtest'},
+    )
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+def _usernames(client: TestClient, headers: dict) -> list[str]:
+    response = client.get('/users/', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    return [user['username'] for user in response.json()['users']]
+
+
+def test_read_users_uses_replica(replicated_client):
+    """
+    Testa se a listagem autenticada é servida pela réplica.
+    """
+    headers = _login(replicated_client)
+
+    assert _usernames(replicated_client, headers) == ['testando', 'replicado']
+
+
+def test_read_users_after_write_reads_from_primary(replicated_client):
+    """
+    Testa o read-your-writes após uma escrita do próprio usuário.
+
+    Depois do PATCH, as leituras do autor vão ao primário e enxergam a
+    alteração, mesmo que a réplica ainda não a tenha recebido.
+    """
+    headers = _login(replicated_client)
+
+    response = replicated_client.patch(
+        '/users/1', headers=headers, json={'username': 'alterado'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    assert _usernames(replicated_client, headers) == ['alterado']
+
+
+def test_pinned_read_bypasses_stale_cached_response(replicated_client):
+    """
+    Testa o cache de respostas com o pin de read-your-writes.
+
+    Após o PATCH, outro cliente lê da réplica atrasada e guarda a lista
+    antiga na versão nova da tabela. O autor da escrita ignora essa
+    entrada e lê do primário, e a resposta dele substitui a guardada.
+    """
+    headers = _login(replicated_client)
+    replicated_client.patch(
+        '/users/1', headers=headers, json={'username': 'alterado'}
+    )
+    pin = replicated_client.cookies.get(PIN_COOKIE)
+
+    replicated_client.cookies.clear()
+    assert _usernames(replicated_client, headers) == ['testando', 'replicado']
+
+    replicated_client.cookies.set(PIN_COOKIE, pin)
+    assert _usernames(replicated_client, headers) == ['alterado']
+
+    replicated_client.cookies.clear()
+    assert _usernames(replicated_client, headers) == ['alterado']
+
+
+def test_failed_write_does_not_pin(replicated_client):
+    """
+    Testa se uma escrita recusada não leva as leituras ao primário.
+    """
+    headers = _login(replicated_client)
+
+    response = replicated_client.patch(
+        '/users/2', headers=headers, json={'username': 'alterado'}
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert PIN_COOKIE not in response.cookies
+    assert _usernames(replicated_client, headers) == ['testando', 'replicado']
+
+
+def test_read_your_writes_pin_survives_another_worker(replicated_client):
+    """
+    Testa se o pin vale em outro worker.
+
+    O roteador é recriado depois da escrita, como em um worker que nunca
+    a viu; o cookie enviado pelo cliente ainda leva a leitura ao primário.
+    """
+    headers = _login(replicated_client)
+    replicated_client.patch(
+        '/users/1', headers=headers, json={'username': 'alterado'}
+    )
+
+    container = app.state.container
+    router = container.replica_router
+    container.replica_router = ReplicaRouter(
+        router.primary,
+        router.replicas,
+        pin_seconds=router.pin_seconds,
+        retry_seconds=router.retry_seconds,
+    )
+
+    assert _usernames(replicated_client, headers) == ['alterado']
+
+
+@pytest.mark.asyncio
+async def test_read_session_falls_back_when_replica_is_down(container, user):
+    """
+    Testa o fallback para o primário quando a réplica está fora do ar.
+
+    A réplica aponta para um diretório inexistente: a conexão falha, ela
+    é marcada como indisponível e a leitura é feita no primário.
+    """
+    broken = create_async_engine(
+        'sqlite+aiosqlite:////nonexistent/dir/replica.db'
+    )
+    container.replica_router = ReplicaRouter(
+        container.engine, [broken], pin_seconds=5, retry_seconds=30
+    )
+
+    async with read_session(container) as session:
+        assert await session.get(User, user.id) is not None
+
+    assert container.replica_router.read_engine() is container.engine
+    await broken.dispose()
+
+
+def test_replica_router_round_robin_and_health():
+    """
+    Testa o rodízio entre réplicas e a indisponibilidade.
+
+    Réplicas marcadas como indisponíveis voltam ao rodízio após
+    `retry_seconds`.
+    """
+    timer = FakeTimer()
+    primary, first, second = object(), object(), object()
+    router = ReplicaRouter(
+        primary, [first, second], pin_seconds=5, retry_seconds=30, timer=timer
+    )
+
+    assert [router.read_engine() for _ in range(3)] == [first, second, first]
+    assert router.read_engine(pinned=True) is primary
+
+    router.mark_down(second)
+    assert router.read_engine() is first
+    assert router.read_engine() is first
+    timer.now = 31
+    assert {router.read_engine(), router.read_engine()} == {first, second}
+
+
+def _request_with_pin(value: str | None) -> Request:
+    headers = []
+    if value is not None:
+        headers.append((b'cookie', f'{PIN_COOKIE}={value}'.encode()))
+    return Request({'type': 'http', 'headers': headers})
+
+
+def test_replica_router_pin_cookie():
+    """
+    Testa o cookie de pin: válido por `pin_seconds` após a escrita,
+    inclusive contra timestamps futuros forjados, e ignorado quando
+    malformado.
+    """
+    clock = FakeTimer()
+    clock.now = 1000.0
+    router = ReplicaRouter(
+        object(), [object()], pin_seconds=5, retry_seconds=30, timer=clock
+    )
+    response = Response()
+    router.pin(response)
+
+    assert f'{PIN_COOKIE}=1000.000' in response.headers['set-cookie']
+    assert router.pinned(_request_with_pin('1000.000'))
+    assert not router.pinned(_request_with_pin('990'))
+    assert not router.pinned(_request_with_pin('2000'))
+    assert not router.pinned(_request_with_pin('garbage'))
+    assert not router.pinned(_request_with_pin(None))
@@ -1,11 +1,31 @@
+from datetime import UTC, datetime
 from http import HTTPStatus
 
-from jwt import decode
+import pytest
+import pytest_asyncio
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+)
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+from httpx import ASGITransport, AsyncClient
+from jwt import InvalidTokenError, decode, encode
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pydantic import ValidationError
+from sqlalchemy import event, select
 
-from fast_api_async.security import ALGORITHM, SECRET_KEY, create_access_token
+from fast_api_async.app import app
+from fast_api_async.models import RefreshToken, User
+from fast_api_async.security import create_access_token, token_claims
+from fast_api_async.settings import Settings
+from fast_api_async.tokens import TokenKeys
 
 
-def test_jwt():
+def test_jwt(settings):
     """
     Testa a criação e decodificação de tokens JWT.
 
@@ -13,8 +33,8 @@ def test_jwt():
     esperados e incluem o campo de expiração.
     """
     data = {'test': 'test'}
-    token = create_access_token(data)
-    decoded = decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    token = create_access_token(data, TokenKeys.from_settings(settings))
+    decoded = decode(token, settings.SECRET_KEY, algorithms=['HS256'])
     assert decoded['test'] == data['test']
     assert 'exp' in decoded
 
@@ -70,3 +90,490 @@ def test_jwt_invalid_token(client):
 
 # TODO:3. Reveja os testes criados até a aula 5 e veja se eles ainda fazem
 # sentido (testes envolvendo 409)
+
+
+def test_get_current_user_uses_cache(client, session, user, token):
+    """
+    Testa se o usuário autenticado é reaproveitado do cache de tokens.
+
+    Após a primeira requisição, a única consulta emitida deve ser a da
+    listagem (outra página, fora do cache de respostas); o usuário do
+    token não é buscado novamente no banco.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/users/', headers=headers)
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    try:
+        response = client.get('/users/?limit=5', headers=headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == 1
+
+
+def test_delete_user_invalidates_cached_token(client, user, token):
+    """
+    Testa se a exclusão do usuário invalida o cache de tokens.
+
+    Após deletar a conta, o mesmo token não deve mais autenticar.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    client.delete(f'/users/{user.id}', headers=headers)
+
+    response = client.get('/users/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_token_carries_stateless_claims(client, settings, user, token):
+    """
+    Testa se o token de acesso inclui id, username e versão do token.
+    """
+    payload = decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+
+    assert payload['sub'] == user.email
+    assert payload['uid'] == user.id
+    assert payload['username'] == user.username
+    assert payload['ver'] == 0
+
+
+def test_password_change_revokes_issued_tokens(client, user, token):
+    """
+    Testa se trocar a senha invalida os tokens emitidos anteriormente,
+    tanto no caminho sem banco (listagem) quanto no `get_current_user`.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/users/', headers=headers)
+
+    client.patch(
+        f'/users/{user.id}', headers=headers, json={'password': 'new_secret'}
+    )
+
+    assert client.get('/users/', headers=headers).status_code == (
+        HTTPStatus.UNAUTHORIZED
+    )
+    response = client.patch(
+        f'/users/{user.id}', headers=headers, json={'username': 'other'}
+    )
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_put_with_same_password_keeps_tokens(client, user, token):
+    """
+    Testa se um PUT que reenvia a senha atual não revoga os tokens, e se
+    um PUT com senha nova revoga.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    data = {
+        'username': 'renamed',
+        'email': user.email,
+        'password': user.clean_password,
+    }
+
+    response = client.put(f'/users/{user.id}', headers=headers, json=data)
+
+    assert response.status_code == HTTPStatus.OK
+    assert client.get('/users/', headers=headers).status_code == (
+        HTTPStatus.OK
+    )
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={**data, 'password': 'new_secret'},
+    )
+    assert client.get('/users/', headers=headers).status_code == (
+        HTTPStatus.UNAUTHORIZED
+    )
+
+
+def test_expired_token_is_rejected(client, settings, user):
+    """
+    Testa se um token expirado retorna 401 em vez de erro interno.
+    """
+    token = encode(
+        {'sub': user.email, 'exp': datetime(2020, 1, 1, tzinfo=UTC)},
+        settings.SECRET_KEY,
+        algorithm='HS256',
+    )
+
+    response = client.get(
+        '/users/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_refresh_token_rotation(client, user):
+    """
+    Testa a renovação do access token com refresh token de uso único.
+
+    O refresh token devolve um novo par de tokens válido e não pode ser
+    reutilizado depois da troca.
+    """
+    login = client.post(
+        '/token',
+        data={'username': user.email, 'password': user.clean_password},
+    ).json()
+
+    response = client.post(
+        '/token/refresh', json={'refresh_token': login['refresh_token']}
+    )
+    renewed = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert renewed['refresh_token'] != login['refresh_token']
+    listing = client.get(
+        '/users/',
+        headers={'Authorization': f'Bearer {renewed["access_token"]}'},
+    )
+    assert listing.status_code == HTTPStatus.OK
+
+    reused = client.post(
+        '/token/refresh', json={'refresh_token': login['refresh_token']}
+    )
+    assert reused.status_code == HTTPStatus.UNAUTHORIZED
+    assert reused.json() == {'detail': 'Invalid refresh token'}
+
+
+def test_password_change_revokes_refresh_tokens(client, user, token):
+    """
+    Testa se trocar a senha invalida os refresh tokens já emitidos.
+    """
+    login = client.post(
+        '/token',
+        data={'username': user.email, 'password': user.clean_password},
+    ).json()
+    client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'password': 'new_secret'},
+    )
+
+    response = client.post(
+        '/token/refresh', json={'refresh_token': login['refresh_token']}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_login_purges_expired_refresh_tokens(container, session, user):
+    """
+    Testa se a emissão de tokens remove os refresh tokens expirados.
+
+    Tokens ainda válidos, inclusive de outros logins, são mantidos.
+    """
+    for token_hash, expires_at in (
+        ('expired', datetime(2000, 1, 1)),
+        ('valid', datetime(2999, 1, 1)),
+    ):
+        session.add(
+            RefreshToken(
+                user_id=user.id,
+                token_hash=token_hash,
+                token_version=user.token_version,
+                expires_at=expires_at,
+            )
+        )
+    await session.commit()
+
+    app.state.container = container
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url='http://test'
+        ) as client:
+            response = await client.post(
+                '/token',
+                data={
+                    'username': user.email,
+                    'password': user.clean_password,
+                },
+            )
+    finally:
+        del app.state.container
+
+    hashes = set(await session.scalars(select(RefreshToken.token_hash)))
+    assert response.status_code == HTTPStatus.OK
+    assert 'expired' not in hashes
+    assert 'valid' in hashes
+    assert len(hashes) == 2  # noqa: PLR2004
+
+
+def test_token_keys_eddsa(settings):
+    """
+    Testa a emissão e validação de tokens EdDSA com chaves pré-carregadas.
+    """
+    private_key = Ed25519PrivateKey.generate()
+    eddsa_settings = settings.model_copy(
+        update={
+            'JWT_ALGORITHM': 'EdDSA',
+            'JWT_PRIVATE_KEY': private_key.private_bytes(
+                Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+            ).decode(),
+            'JWT_PUBLIC_KEY': private_key.public_key()
+            .public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+            .decode(),
+        }
+    )
+    keys = TokenKeys.from_settings(eddsa_settings)
+
+    token = create_access_token({'sub': 'a@b.c'}, keys=keys)
+
+    assert keys.decode(token)['sub'] == 'a@b.c'
+    with pytest.raises(InvalidTokenError):
+        TokenKeys.from_settings(settings).decode(token)
+
+
+def test_token_keys_hmac_requires_secret_key(settings):
+    """
+    Testa se o HS256 sem `SECRET_KEY` é rejeitado, em vez de assinar com
+    uma chave padrão.
+    """
+    settings = settings.model_copy(update={'SECRET_KEY': None})
+
+    with pytest.raises(ValueError, match='SECRET_KEY'):
+        TokenKeys.from_settings(settings)
+
+
+def test_token_keys_asymmetric_requires_keys(settings):
+    """
+    Testa se um algoritmo assimétrico sem chaves PEM é rejeitado.
+    """
+    settings = settings.model_copy(update={'JWT_ALGORITHM': 'ES256'})
+
+    with pytest.raises(ValueError, match='requires JWT_PRIVATE_KEY'):
+        TokenKeys.from_settings(settings)
+
+
+@pytest.mark.parametrize('algorithm', ['none', 'HS512', 'RS256'])
+def test_jwt_algorithm_rejects_unsupported_values(algorithm):
+    """
+    Testa se `JWT_ALGORITHM` aceita apenas HS256, EdDSA e ES256.
+    """
+    with pytest.raises(ValidationError, match='JWT_ALGORITHM'):
+        Settings(
+            _env_file=None,
+            DATABASE_URL='sqlite+aiosqlite:///:memory:',
+            JWT_ALGORITHM=algorithm,
+        )
+
+
+def test_login_email_is_case_insensitive(client, user):
+    """
+    Testa se o login aceita o email com maiúsculas diferentes.
+    """
+    response = client.post(
+        '/token',
+        data={
+            'username': user.email.upper(),
+            'password': user.clean_password,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_login_rate_limit_rejects_before_database(
+    client, settings, container, user
+):
+    """
+    Testa o limite de tentativas de login por conta.
+
+    Acima do limite, a resposta é 429 com `Retry-After` e nenhuma
+    consulta ao banco (nem Argon2) é feita.
+    """
+    data = {'username': user.email, 'password': 'wrong'}
+    for _ in range(settings.LOGIN_RATE_LIMIT_PER_ACCOUNT):
+        client.post('/token', data=data)
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = container.engine.sync_engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    try:
+        response = client.post('/token', data=data)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['Retry-After']) > 0
+    assert statements == []
+
+
+def _captured_statements(container, action) -> list[str]:
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = container.engine.sync_engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        action()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    return statements
+
+
+def test_login_costs_one_verify_for_unknown_and_known_users(
+    client, container, user
+):
+    """
+    Testa se todo login falho custa exatamente uma verificação Argon2.
+
+    Email inexistente e senha errada devem ter o mesmo custo, para que o
+    tempo de resposta não revele se a conta existe. Isso vale já para o
+    primeiro email inexistente, pois o hash descartável é gerado na
+    inicialização.
+    """
+    unknown = {'username': 'nobody@test.com', 'password': 'secret'}
+    wrong = {'username': user.email, 'password': 'wrong'}
+
+    for data in (unknown, unknown, wrong):
+        completed = container.hasher.stats().completed
+        response = client.post('/token', data=data)
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert container.hasher.stats().completed == completed + 1
+
+
+@pytest_asyncio.fixture
+async def outdated_user(session):
+    """
+    Fixture com um usuário cujo hash usa parâmetros Argon2 antigos.
+
+    Returns:
+        User: Usuário criado com `time_cost=1`
+    """
+    user = User(
+        username='antigo',
+        email='antigo@test.com',
+        password=Argon2Hasher(time_cost=1).hash('secret'),
+    )
+    session.add(user)
+    await session.commit()
+    return user
+
+
+def test_login_rehashes_outdated_password(client, container, outdated_user):
+    """
+    Testa a atualização transparente de hashes com parâmetros antigos.
+
+    O primeiro login regrava o hash; o segundo já o encontra atualizado
+    e não emite UPDATE. A senha continua válida e os tokens já emitidos
+    não são revogados.
+    """
+    data = {'username': outdated_user.email, 'password': 'secret'}
+
+    first = _captured_statements(
+        container, lambda: client.post('/token', data=data)
+    )
+    responses = []
+    second = _captured_statements(
+        container, lambda: responses.append(client.post('/token', data=data))
+    )
+
+    assert any(s.startswith('UPDATE users SET password') for s in first)
+    assert not any(s.startswith('UPDATE users') for s in second)
+    assert responses[0].status_code == HTTPStatus.OK
+    payload = container.token_keys.decode(responses[0].json()['access_token'])
+    assert payload['ver'] == 0
+
+
+def test_get_current_user_does_not_load_password(client, container, user):
+    """
+    Testa se a autenticação das escritas não lê o hash da senha.
+
+    Um PATCH de perfil com token novo (fora do cache) consulta apenas o
+    id e a versão de token do usuário.
+    """
+    token = client.post(
+        '/token',
+        data={'username': user.email, 'password': user.clean_password},
+    ).json()['access_token']
+
+    statements = _captured_statements(
+        container,
+        lambda: client.patch(
+            f'/users/{user.id}',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'username': 'renomeado'},
+        ),
+    )
+
+    assert statements[0].startswith('SELECT users.id, users.token_version')
+    assert not any('users.password' in s for s in statements)
+
+
+def test_token_does_not_follow_reassigned_email(client, user, token):
+    """
+    Testa se o token segue o id do usuário, e não o email.
+
+    Depois que o dono troca o email e outra pessoa cadastra o email
+    antigo, o token anterior continua valendo para o dono e não pode
+    agir sobre a conta nova.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    old_email = user.email
+    client.patch(
+        f'/users/{user.id}', headers=headers, json={'email': 'novo@test.com'}
+    )
+    new_user = client.post(
+        '/users/',
+        json={'username': 'outro', 'email': old_email, 'password': 'x'},
+    ).json()
+
+    response = client.delete(f'/users/{new_user["id"]}', headers=headers)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+    response = client.patch(
+        f'/users/{user.id}', headers=headers, json={'username': 'renomeado'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_token_without_username_is_resolved_by_id(client, container, user):
+    """
+    Testa os tokens emitidos com `AUTH_STATELESS_TOKENS` desabilitado.
+
+    Eles trazem id e versão, mas não o username: a leitura os resolve no
+    banco pelo id, o email antigo reaproveitado por outra conta não muda
+    a identidade e a troca de senha os revoga também nas listagens.
+    """
+    claims = token_claims(user, stateless=False)
+    assert 'username' not in claims
+    token = create_access_token(claims, container.token_keys)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.patch(
+        f'/users/{user.id}', headers=headers, json={'email': 'novo@test.com'}
+    )
+    new_user = client.post(
+        '/users/',
+        json={'username': 'outro', 'email': user.email, 'password': 'x'},
+    ).json()
+    response = client.delete(f'/users/{new_user["id"]}', headers=headers)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert client.get('/users/', headers=headers).status_code == (
+        HTTPStatus.OK
+    )
+
+    client.patch(
+        f'/users/{user.id}', headers=headers, json={'password': 'nova'}
+    )
+    assert client.get('/users/', headers=headers).status_code == (
+        HTTPStatus.UNAUTHORIZED
+    )
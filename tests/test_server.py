@@ -0,0 +1,104 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from http import HTTPStatus
+from pathlib import Path
+
+import httpx
+
+from fast_api_async.server import build_config, hashing_workers
+from fast_api_async.settings import Settings
+
+ROOT = Path(__file__).parents[1]
+
+
+def _settings(**values) -> Settings:
+    return Settings(
+        _env_file=None, DATABASE_URL='sqlite+aiosqlite:///:memory:', **values
+    )
+
+
+def test_build_config_uses_production_defaults():
+    """
+    Testa a configuração do uvicorn usada pelos workers.
+
+    Verifica uvloop, httptools, lifespan obrigatório, o timeout de
+    encerramento e a precedência dos argumentos sobre as configurações.
+    """
+    config = build_config(
+        _settings(SERVER_PORT=9000, SERVER_GRACEFUL_TIMEOUT_SECONDS=10),
+        host='127.0.0.1',
+    )
+
+    assert config.loop == 'uvloop'
+    assert config.http == 'httptools'
+    assert config.lifespan == 'on'
+    assert config.access_log is False
+    assert config.timeout_graceful_shutdown == 10  # noqa: PLR2004
+    assert (config.host, config.port) == ('127.0.0.1', 9000)
+
+
+def test_hashing_workers_split_cpus_between_workers(monkeypatch):
+    """
+    Testa a divisão das CPUs entre os pools de Argon2 dos workers.
+    """
+    monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+
+    assert hashing_workers(_settings(), 4) == 2  # noqa: PLR2004
+    assert hashing_workers(_settings(), 16) == 1
+    assert hashing_workers(_settings(HASHING_MAX_WORKERS=0), 4) == 0
+
+
+def test_server_serves_with_workers_and_drains_on_sigterm():
+    """
+    Testa o servidor de produção com múltiplos workers.
+
+    Sobe o servidor em um subprocesso, faz uma requisição e envia SIGTERM
+    ao processo mestre, que deve encerrar os workers e sair com código 0.
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'fast_api_async.server',
+            '--host',
+            '127.0.0.1',
+            '--port',
+            str(port),
+            '--workers',
+            '2',
+        ],
+        cwd=ROOT,
+        env={
+            **os.environ,
+            'DATABASE_URL': 'sqlite+aiosqlite:///:memory:',
+            'SECRET_KEY': 'test-secret-key-for-hs256-signatures',
+            'HASHING_MAX_WORKERS': '0',
+        },
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                response = httpx.get(f'http://127.0.0.1:{port}/')
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, 'server did not start'
+                time.sleep(0.1)
+
+        assert response.status_code == HTTPStatus.OK
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=20) == 0
+    finally:
+        server.kill()
+        server.wait()